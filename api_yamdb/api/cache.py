@@ -0,0 +1,175 @@
+import hashlib
+import threading
+import time
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from reviews.models import Category, DataVersion, Genre
+from .metrics import cache_result
+
+# Версии, прочитанные за время текущего запроса (см. DataVersionMiddleware);
+# None - вне запроса, версии читаются при каждом обращении
+request_versions = ContextVar('data_versions', default=None)
+
+
+class RequestVersions:
+    """Снимок таблицы DataVersion на время одного запроса."""
+
+    def __init__(self):
+        self.versions = None
+
+
+def read_versions(labels=None):
+    rows = DataVersion.objects.values_list('model', 'version', 'modified')
+    if labels is not None:
+        rows = rows.filter(model__in=labels)
+    return {
+        label: (version, int(modified.timestamp()))
+        for label, version, modified in rows
+    }
+
+
+def get_versions(models):
+    """Версии и время последнего изменения данных моделей.
+
+    Читаются из таблицы DataVersion, общей для всех процессов. Возвращает
+    словарь {модель: (версия, unix time)}; у модели, данные которой ещё
+    не менялись, - (0, None). В запросе таблица (по строке на модель)
+    читается один раз целиком, и ETag, ключи кэша и справочники строятся
+    по одним и тем же версиям.
+    """
+    labels = {model._meta.label_lower: model for model in models}
+    memo = request_versions.get()
+    if memo is None:
+        versions = read_versions(labels)
+    else:
+        if memo.versions is None:
+            memo.versions = read_versions()
+        versions = memo.versions
+    return {
+        model: versions.get(label, (0, None))
+        for label, model in labels.items()
+    }
+
+
+def get_version(model):
+    """Текущая версия данных модели."""
+    return get_versions([model])[model][0]
+
+
+def bump_versions(models):
+    """Увеличивает версии данных моделей, делая устаревшим их кэш.
+
+    Версия не меньше текущего времени в микросекундах: ни после удаления
+    записи, ни после отката транзакции, в которой под новой версией уже
+    могло что-то закэшироваться, версии не повторяются.
+    """
+    labels = {model._meta.label_lower for model in models}
+    now = timezone.now()
+    version = time.time_ns() // 1000
+    updated = DataVersion.objects.filter(model__in=labels).update(
+        version=Greatest(F('version') + 1, version), modified=now
+    )
+    if updated < len(labels):
+        DataVersion.objects.bulk_create([
+            DataVersion(model=label, version=version, modified=now)
+            for label in labels
+        ], ignore_conflicts=True)
+    memo = request_versions.get()
+    if memo is not None:
+        memo.versions = None
+
+
+class BumpedVersions:
+    """Пустой колбэк on_commit, отмечающий модели с увеличенной версией.
+
+    При откате транзакции или точки сохранения Django отбрасывает его
+    вместе с колбэками, так что отметка откатывается вместе с UPDATE.
+    """
+
+    def __init__(self, models):
+        self.models = models
+
+    def __call__(self):
+        pass
+
+
+def bump_versions_once(models):
+    """Увеличивает версии моделей в текущей транзакции, по разу на модель.
+
+    Сигналы приходят на каждую строку (например, при каскадном удалении),
+    а версия каждой модели увеличивается одним UPDATE в той же транзакции,
+    что и запись данных: другие процессы видят новые данные и новую версию
+    одновременно. Вне транзакции версии увеличиваются сразу.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        bump_versions(models)
+        return
+    bumped = set().union(*(
+        func.models for _, func in connection.run_on_commit
+        if isinstance(func, BumpedVersions)
+    ))
+    models = set(models) - bumped
+    if models:
+        bump_versions(models)
+        transaction.on_commit(BumpedVersions(models))
+
+
+def versioned_key(prefix, models, data):
+    """Ключ кэша, устаревающий при изменении данных любой из моделей."""
+    versions = ':'.join(
+        str(version) for version, _ in get_versions(models).values()
+    )
+    digest = hashlib.md5(data.encode()).hexdigest()
+    return f'{prefix}:{versions}:{digest}'
+
+
+class SlugLookupCache:
+    """Отображение slug -> объект для всей таблицы в памяти процесса.
+
+    При обращении сверяется версия данных модели из общей для процессов
+    таблицы DataVersion; в запросе она берётся из снимка версий, так что
+    в установившемся режиме кэш не делает своих запросов к БД. При смене
+    версии, в том числе после записи в другом процессе, таблица
+    перечитывается целиком.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.version = None
+        self.objects = {}
+        self.lock = threading.Lock()
+
+    def mapping(self):
+        version = get_version(self.model)
+        cache_result(f'lookup:{self.model._meta.model_name}',
+                     version == self.version)
+        if version != self.version:
+            with self.lock:
+                if version != self.version:
+                    self.objects = {
+                        obj.slug: obj for obj in self.model.objects.all()
+                    }
+                    self.version = version
+        return self.objects
+
+    def all(self):
+        """Все объекты в порядке сортировки модели."""
+        return list(self.mapping().values())
+
+    def get(self, slug):
+        return self.mapping().get(slug)
+
+
+category_cache = SlugLookupCache(Category)
+genre_cache = SlugLookupCache(Genre)
+
+LOOKUP_CACHES = {
+    Category: category_cache,
+    Genre: genre_cache,
+}
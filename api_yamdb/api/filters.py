@@ -1,6 +1,9 @@
+from django.db.models import CharField, Count, F, IntegerField, Value
+from django.db.models.functions import Cast
 from django_filters import rest_framework as filters
 
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitleFilter(filters.FilterSet):
@@ -17,7 +20,44 @@ class TitleFilter(filters.FilterSet):
     year = filters.NumberFilter(
         field_name="year"
     )
+    search = filters.CharFilter(
+        method="filter_search"
+    )
 
     class Meta:
         model = Title
-        fields = ("name", "category", "genre", "year")
+        fields = ("name", "category", "genre", "year", "search")
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+
+def count_facets(queryset):
+    """Считает произведения по жанрам, категориям и десятилетиям.
+
+    Все три группировки объединяются через UNION ALL в один запрос.
+    """
+    titles = Title.objects.filter(pk__in=queryset.values("pk")).order_by()
+    facets = {
+        "genre": F("genre__slug"),
+        "category": F("category__slug"),
+        "decade": Cast(
+            F("year") / 10 * 10,
+            output_field=IntegerField()
+        ),
+    }
+    parts = [
+        titles.annotate(
+            facet=Value(facet, output_field=CharField()),
+            key=Cast(expression, output_field=CharField())
+        )
+        .exclude(key=None)
+        .values("facet", "key")
+        .annotate(count=Count("id", distinct=True))
+        .values_list("facet", "key", "count")
+        for facet, expression in facets.items()
+    ]
+    result = {facet: {} for facet in facets}
+    for facet, key, count in parts[0].union(*parts[1:], all=True):
+        result[facet][key] = count
+    return result
@@ -0,0 +1,170 @@
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management import BaseCommand, CommandError
+from django.test import Client
+
+from api.recording import ANONYMOUS, read_log
+from api.utils import get_token_for_user
+from reviews.models import User
+
+
+def percentiles(values):
+    """p50, p95 и p99 выборки."""
+    if len(values) == 1:
+        return values * 3
+    cuts = statistics.quantiles(values, n=100, method='inclusive')
+    return [cuts[49], cuts[94], cuts[98]]
+
+
+class Command(BaseCommand):
+    help = "Воспроизводит журнал запросов и сравнивает задержки"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'log',
+            help='Журнал RequestRecordMiddleware (REQUEST_LOG_FILE)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Количество одновременных клиентов'
+        )
+        parser.add_argument(
+            '--speed',
+            type=float,
+            default=0,
+            help='Во сколько раз быстрее записи воспроизводить запросы '
+                 '(0 - без пауз, 1 - в исходном темпе)'
+        )
+        parser.add_argument(
+            '--url',
+            help='Адрес запущенного сервера; без него запросы выполняются '
+                 'в этом процессе через django.test.Client'
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл JSON с результатами'
+        )
+
+    def handle(self, *args, **options):
+        records = read_log(options['log'])
+        if not records:
+            raise CommandError('Журнал запросов пуст.')
+        self.base_url = (options['url'] or '').rstrip('/')
+        self.tokens = self.role_tokens(
+            {record['r'] for record in records} - {ANONYMOUS}
+        )
+        results = self.replay(
+            records, options['concurrency'], options['speed']
+        )
+        summary = self.summarize(records, results)
+        self.report(summary)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(summary, file, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def role_tokens(roles):
+        """JWT пользователя replay_<роль> для каждой роли из журнала."""
+        tokens = {}
+        for role in roles:
+            user, _ = User.objects.get_or_create(
+                username=f'replay_{role}',
+                defaults={'email': f'replay_{role}@replay.fake',
+                          'role': role},
+            )
+            tokens[role] = get_token_for_user(user)
+        return tokens
+
+    def replay(self, records, concurrency, speed):
+        """Выполняет запросы журнала, соблюдая интервалы с учётом speed.
+
+        Возвращает список (длительность в мс, статус) в порядке журнала.
+        """
+        first = records[0]['t']
+        started = time.perf_counter()
+        local = threading.local()
+
+        def send(record):
+            if speed:
+                delay = (record['t'] - first) / speed - (
+                    time.perf_counter() - started
+                )
+                if delay > 0:
+                    time.sleep(delay)
+            clock = time.perf_counter()
+            status = self.send(local, record)
+            return (time.perf_counter() - clock) * 1000, status
+
+        with ThreadPoolExecutor(concurrency) as executor:
+            return list(executor.map(send, records))
+
+    def send(self, local, record):
+        headers = {}
+        if record['r'] in self.tokens:
+            headers['Authorization'] = f'Bearer {self.tokens[record["r"]]}'
+        path = record['p'] + (f'?{record["q"]}' if record['q'] else '')
+        body = json.dumps(record['b']) if 'b' in record else ''
+        if self.base_url:
+            request = urllib.request.Request(
+                self.base_url + path, data=body.encode() or None,
+                method=record['m'],
+                headers={**headers, 'Content-Type': 'application/json'}
+            )
+            try:
+                with urllib.request.urlopen(request) as response:
+                    response.read()
+                    return response.status
+            except urllib.error.HTTPError as error:
+                return error.code
+        if not hasattr(local, 'client'):
+            local.client = Client()
+        return local.client.generic(
+            record['m'], path, body, content_type='application/json',
+            **{f'HTTP_{name.upper()}': value
+               for name, value in headers.items()}
+        ).status_code
+
+    @staticmethod
+    def summarize(records, results):
+        """Задержки записи и воспроизведения по маршрутам."""
+        groups = defaultdict(lambda: {'recorded': [], 'replayed': [],
+                                      'statuses': defaultdict(int)})
+        for record, (duration, status) in zip(records, results):
+            group = groups[f'{record["m"]} {record["v"] or record["p"]}']
+            group['recorded'].append(record['d'])
+            group['replayed'].append(duration)
+            group['statuses'][str(status)] += 1
+        summary = {}
+        for name, group in sorted(groups.items()):
+            recorded = percentiles(group['recorded'])
+            replayed = percentiles(group['replayed'])
+            summary[name] = {
+                'requests': len(group['replayed']),
+                'recorded': dict(zip(('p50', 'p95', 'p99'), recorded)),
+                'replayed': dict(zip(('p50', 'p95', 'p99'), replayed)),
+                'statuses': dict(group['statuses']),
+            }
+        return summary
+
+    def report(self, summary):
+        self.stdout.write(
+            f'{"маршрут":<36} {"зап.":>6} {"p50 зап.":>9} {"p50":>8} '
+            f'{"p95":>8} {"p99":>8}  статусы'
+        )
+        for name, result in summary.items():
+            replayed = result['replayed']
+            self.stdout.write(
+                f'{name:<36} {result["requests"]:6d} '
+                f'{result["recorded"]["p50"]:9.2f} {replayed["p50"]:8.2f} '
+                f'{replayed["p95"]:8.2f} {replayed["p99"]:8.2f}  '
+                f'{result["statuses"]}'
+            )
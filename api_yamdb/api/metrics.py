@@ -0,0 +1,249 @@
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+class Registry:
+    """Метрики процесса: счётчики и гистограммы с метками.
+
+    Обновления защищены блокировкой. Если задан METRICS_DIR, процесс
+    раз в METRICS_FLUSH_INTERVAL секунд и при выходе сохраняет свой снимок
+    в отдельный файл каталога, а /metrics суммирует файлы всех процессов.
+    Процессы не пишут в общий файл, поэтому блокировки между ними не нужны.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.reset()
+
+    def reset(self):
+        """Обнуляет значения; вызывается и в дочернем процессе после fork,
+        чтобы тот не выдавал данные родителя за свои. Блокировка
+        создаётся заново: при fork её мог держать другой поток.
+        """
+        self.lock = threading.Lock()
+        self.values = {name: {} for name in self.metrics}
+        self.started = time.time_ns()
+        self.flushed = time.monotonic()
+
+    def register(self, metric):
+        with self.lock:
+            self.metrics[metric.name] = metric
+            self.values[metric.name] = {}
+        return metric
+
+    def update(self, name, labels, update):
+        with self.lock:
+            values = self.values[name]
+            values[labels] = update(values.get(labels))
+        self.maybe_flush()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: [[list(labels), value]
+                       for labels, value in values.items()]
+                for name, values in self.values.items()
+            }
+
+    @staticmethod
+    def directory():
+        return settings.METRICS_DIR and Path(settings.METRICS_DIR)
+
+    def file_path(self):
+        return self.directory() / f'{os.getpid()}-{self.started}.json'
+
+    def maybe_flush(self):
+        if self.directory() and (
+                time.monotonic() - self.flushed
+                >= settings.METRICS_FLUSH_INTERVAL):
+            self.flush()
+
+    def flush(self):
+        """Атомарно перезаписывает файл снимка этого процесса."""
+        if not self.directory():
+            return
+        self.flushed = time.monotonic()
+        path = self.file_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(f'.{threading.get_ident()}.tmp')
+        temporary.write_text(json.dumps(self.snapshot()), encoding='utf-8')
+        os.replace(temporary, path)
+
+    def collect(self):
+        """Значения всех процессов: {имя: {метки: значение}}."""
+        snapshots = [self.snapshot()]
+        directory = self.directory()
+        if directory and directory.is_dir():
+            own = self.file_path().name
+            for path in directory.glob('*.json'):
+                if path.name == own:
+                    continue
+                try:
+                    snapshots.append(
+                        json.loads(path.read_text(encoding='utf-8'))
+                    )
+                except (OSError, ValueError):
+                    continue
+        merged = {name: {} for name in self.metrics}
+        for snapshot in snapshots:
+            for name, values in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                for labels, value in values:
+                    labels = tuple(labels)
+                    merged[name][labels] = metric.merge(
+                        merged[name].get(labels), value
+                    )
+        return merged
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        registry.register(self)
+
+    def labels_key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def inc(self, amount=1, **labels):
+        self.registry.update(
+            self.name, self.labels_key(labels),
+            lambda value: (value or 0) + amount
+        )
+
+    @staticmethod
+    def merge(value, other):
+        return (value or 0) + other
+
+    def samples(self, labels, value):
+        yield self.name, labels, value
+
+
+class Histogram(Counter):
+    """Гистограмма: значение - [счётчики корзин..., сумма, количество]."""
+
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(),
+                 buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(registry, name, documentation, labelnames)
+
+    def observe(self, amount, **labels):
+        def update(value):
+            value = value or [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if amount <= bound:
+                    value[index] += 1
+                    break
+            value[-2] += amount
+            value[-1] += 1
+            return value
+
+        self.registry.update(self.name, self.labels_key(labels), update)
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    @staticmethod
+    def merge(value, other):
+        if value is None:
+            return list(other)
+        return [left + right for left, right in zip(value, other)]
+
+    def samples(self, labels, value):
+        cumulative = 0
+        for bound, count in zip(self.buckets, value):
+            cumulative += count
+            yield (f'{self.name}_bucket', labels + (('le', bound),),
+                   cumulative)
+        yield f'{self.name}_bucket', labels + (('le', '+Inf'),), value[-1]
+        yield f'{self.name}_sum', labels, value[-2]
+        yield f'{self.name}_count', labels, value[-1]
+
+
+def escape(value):
+    return (str(value).replace('\\', r'\\').replace('\n', r'\n')
+            .replace('"', r'\"'))
+
+
+def render(registry):
+    """Все метрики в текстовом формате Prometheus."""
+    lines = []
+    for name, values in registry.collect().items():
+        metric = registry.metrics[name]
+        lines.append(f'# HELP {name} {metric.documentation}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        for labels, value in sorted(values.items()):
+            pairs = tuple(zip(metric.labelnames, labels))
+            for sample, sample_labels, sample_value in metric.samples(
+                    pairs, value):
+                label_text = ','.join(
+                    f'{key}="{escape(label)}"'
+                    for key, label in sample_labels
+                )
+                lines.append(
+                    f'{sample}{{{label_text}}} {sample_value}' if label_text
+                    else f'{sample} {sample_value}'
+                )
+    return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+os.register_at_fork(after_in_child=registry.reset)
+atexit.register(registry.flush)
+
+REQUEST_DURATION = Histogram(
+    registry, 'yamdb_request_duration_seconds',
+    'Время обработки запроса.', ('view', 'action', 'method')
+)
+REQUESTS = Counter(
+    registry, 'yamdb_requests_total',
+    'Количество запросов по статусу ответа.', ('view', 'action', 'status')
+)
+REQUEST_QUERIES = Histogram(
+    registry, 'yamdb_request_queries',
+    'Количество запросов к БД за запрос.', ('view', 'action'),
+    buckets=QUERY_BUCKETS
+)
+REQUEST_DB_DURATION = Histogram(
+    registry, 'yamdb_request_db_duration_seconds',
+    'Время запросов к БД за запрос.', ('view', 'action')
+)
+CACHE_REQUESTS = Counter(
+    registry, 'yamdb_cache_requests_total',
+    'Обращения к кэшу: result - hit или miss.', ('cache', 'result')
+)
+EMAIL_DURATION = Histogram(
+    registry, 'yamdb_email_send_duration_seconds',
+    'Время отправки письма.'
+)
+
+
+def cache_result(name, hit):
+    CACHE_REQUESTS.inc(cache=name, result='hit' if hit else 'miss')
@@ -0,0 +1,142 @@
+import random
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from .cache import RequestVersions, request_versions
+from .metrics import (REQUEST_DB_DURATION, REQUEST_DURATION,
+                      REQUEST_QUERIES, REQUESTS)
+from .recording import RequestLog, make_record, request_body
+from .timing import ServerTiming, current_timing
+
+
+class RequestRecordMiddleware:
+    """Записывает долю запросов в журнал для команды replay_requests.
+
+    Включается настройкой REQUEST_LOG_FILE, доля запросов - в
+    REQUEST_LOG_SAMPLE_RATE. Заголовки авторизации не записываются,
+    только роль пользователя.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_LOG_FILE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.log = RequestLog(settings.REQUEST_LOG_FILE)
+
+    def __call__(self, request):
+        if random.random() >= settings.REQUEST_LOG_SAMPLE_RATE:
+            return self.get_response(request)
+        # Тело читается до DRF: после чтения потока request.body недоступно
+        body = request_body(request, settings.REQUEST_LOG_MAX_BODY_SIZE)
+        started, clock = time.time(), time.perf_counter()
+        response = self.get_response(request)
+        self.log.write(make_record(
+            request, body, response, started, time.perf_counter() - clock
+        ))
+        return response
+
+
+class DataVersionMiddleware:
+    """Читает версии данных один раз на запрос.
+
+    ETag, ключи кэша количества и фасетов и справочники slug берут
+    версии из одного снимка таблицы DataVersion (см. api.cache).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = request_versions.set(RequestVersions())
+        try:
+            return self.get_response(request)
+        finally:
+            request_versions.reset(token)
+
+
+class ServerTimingMiddleware:
+    """Отдаёт время фаз запроса в заголовке Server-Timing и в лог api.timing.
+
+    Включается настройкой SERVER_TIMING. Фазы DRF (auth, permissions,
+    serialize, render) замеряет ServerTimingMixin, запросы к БД - обёртка
+    соединения. Выключенный не загружается вовсе.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = ServerTiming()
+        token = current_timing.set(timing)
+        try:
+            with connection.execute_wrapper(timing):
+                response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        metrics = timing.metrics()
+        response['Server-Timing'] = timing.header(metrics)
+        timing.log(request, response, metrics)
+        return response
+
+
+class QueryStats:
+    """Обёртка connection.execute_wrapper: число и время запросов к БД."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+def view_labels(request):
+    """Метки view и action: класс представления DRF и его действие."""
+    match = request.resolver_match
+    if match is None:
+        return 'none', 'none'
+    view = getattr(match.func, 'cls', None)
+    actions = getattr(match.func, 'actions', None) or {}
+    return (
+        view.__name__ if view else match.view_name,
+        actions.get(request.method.lower(), request.method.lower())
+    )
+
+
+class MetricsMiddleware:
+    """Собирает метрики запросов для /metrics (см. api.metrics).
+
+    Включается настройкой METRICS_ENABLED.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryStats()
+        started = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        view, action = view_labels(request)
+        REQUEST_DURATION.observe(
+            duration, view=view, action=action, method=request.method
+        )
+        REQUESTS.inc(view=view, action=action, status=response.status_code)
+        REQUEST_QUERIES.observe(queries.count, view=view, action=action)
+        REQUEST_DB_DURATION.observe(
+            queries.duration, view=view, action=action
+        )
+        return response
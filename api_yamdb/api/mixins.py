@@ -1,7 +1,119 @@
+import hashlib
+from functools import partial
+
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework import filters, mixins, viewsets
 from rest_framework.pagination import LimitOffsetPagination
 
+from .cache import get_versions
 from .permissions import IsAdminOrReadOnly
+from .timing import current_timing, timed, timed_serializer
+
+
+class ServerTimingMixin:
+    """Замеры фаз DRF для заголовка Server-Timing.
+
+    Работает, только когда включён ServerTimingMiddleware, иначе каждая
+    обёртка сводится к чтению ContextVar.
+    """
+
+    def perform_authentication(self, request):
+        with timed('auth'):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with timed('permissions'):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with timed('permissions'):
+            super().check_object_permissions(request, obj)
+
+    def get_serializer(self, *args, **kwargs):
+        return timed_serializer(super().get_serializer(*args, **kwargs))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        # Обычно ответ рендерится уже после view; при замерах - здесь,
+        # чтобы время рендеринга попало в свою фазу
+        if current_timing.get() is not None and not getattr(
+                response, 'is_rendered', True):
+            with timed('render'):
+                response.render()
+        return response
+
+
+class ConditionalGetMixin:
+    """Условные GET-запросы (ETag / Last-Modified) для list и retrieve.
+
+    Валидаторы строятся по версиям и времени изменения моделей из
+    `etag_models`, прочитанным одним запросом из общей для процессов
+    таблицы DataVersion. Поэтому все процессы выдают одинаковые валидаторы,
+    а ответ 304 отдаётся после проверки прав, но до выборки и сериализации.
+    """
+
+    etag_models = ()
+    conditional_actions = ('list', 'retrieve')
+
+    def get_validators(self, request):
+        versions = get_versions(self.etag_models).values()
+        query = sorted(request.query_params.lists())
+        key = (f'{request.path}?{query}:{request.accepted_renderer.format}'
+               ':' + ':'.join(str(version) for version, _ in versions))
+        etag = quote_etag(hashlib.md5(key.encode()).hexdigest())
+        last_modified = max((
+            modified for _, modified in versions if modified is not None
+        ), default=None)
+        return etag, last_modified
+
+    def conditional(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in self.conditional_actions:
+            method = request.method.lower()
+            setattr(self, method, partial(self.conditional,
+                                          getattr(self, method)))
+
+
+class NestedParentMixin:
+    """Родительский объект вложенного маршрута (titles/.../reviews/...).
+
+    Родитель ищется одним запросом сразу по всем параметрам цепочки из
+    `parent_lookup_kwargs` ({поле модели: параметр URL}) и запоминается
+    на время запроса, так что get_queryset, perform_create и проверки
+    прав (через `view.get_parent()`) не повторяют выборку.
+    """
+
+    parent_queryset = None
+    parent_lookup_kwargs = {}
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(
+                self.parent_queryset.all(),
+                **{
+                    field: self.kwargs.get(kwarg)
+                    for field, kwarg in self.parent_lookup_kwargs.items()
+                }
+            )
+        return self._parent
 
 
 class CreateListViewSet(mixins.CreateModelMixin, mixins.ListModelMixin,
@@ -10,6 +122,8 @@ class CreateListViewSet(mixins.CreateModelMixin, mixins.ListModelMixin,
 
 
 class CustomMixin(
+    ServerTimingMixin,
+    ConditionalGetMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     mixins.ListModelMixin,
@@ -20,3 +134,10 @@ class CustomMixin(
     permission_classes = (IsAdminOrReadOnly,)
     lookup_field = "slug"
     search_fields = ["=name"]
+    lookup_cache = None
+
+    def get_queryset(self):
+        if (self.action == "list" and self.lookup_cache is not None
+                and not self.request.query_params.get("search")):
+            return self.lookup_cache.all()
+        return super().get_queryset()
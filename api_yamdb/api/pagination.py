@@ -0,0 +1,226 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .cache import versioned_key
+from .metrics import cache_result
+
+
+class CachedCountPaginator(Paginator):
+    """Пагинатор, кэширующий COUNT(*) по тексту запроса и версии модели."""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        try:
+            sql = str(queryset.query)
+        except (AttributeError, EmptyResultSet):
+            return super().count
+        model = queryset.model
+        key = versioned_key(
+            f'count:{model._meta.label_lower}', [model], sql
+        )
+        count = cache.get(key)
+        cache_result('count', count is not None)
+        if count is None:
+            count = super().count
+            cache.set(key, count, settings.COUNT_CACHE_TIMEOUT)
+        return count
+
+
+class CountedPagination(PageNumberPagination):
+    """Постраничная пагинация с отключаемым подсчётом `count`.
+
+    При `?count=false` общее количество не считается: страница выбирается
+    с одной лишней строкой, по которой определяется наличие следующей.
+    """
+
+    django_paginator_class = CachedCountPaginator
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.with_count = request.query_params.get(
+            self.count_query_param, ''
+        ).lower() not in ('false', '0', 'no')
+        if self.with_count:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        page_number = request.query_params.get(self.page_query_param) or 1
+        try:
+            self.page_number = int(page_number)
+            if self.page_number < 1:
+                raise ValueError
+        except ValueError:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message='Неверный номер страницы.'
+            ))
+        offset = (self.page_number - 1) * page_size
+        results = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(results) > page_size
+        return results[:page_size]
+
+    def get_next_link(self):
+        if self.with_count:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.page_query_param, self.page_number + 1
+        )
+
+    def get_previous_link(self):
+        if self.with_count:
+            return super().get_previous_link()
+        if self.page_number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.page_query_param, self.page_number - 1
+        )
+
+    def get_paginated_response(self, data):
+        if self.with_count:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+
+class KeysetPagination(CountedPagination):
+    """Постраничная пагинация с опциональным режимом курсора.
+
+    Если в запросе передан параметр `cursor` (для первой страницы - пустой),
+    выборка идёт по ключу сортировки `ordering` без COUNT(*) и OFFSET.
+    """
+
+    cursor_query_param = 'cursor'
+    ordering = ('-id',)
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request, queryset.model)
+        fields = [
+            (name.lstrip('-'), name.startswith('-'))
+            for name in self.ordering
+        ]
+        queryset = queryset.order_by(*(
+            f'-{name}' if desc != reverse else name for name, desc in fields
+        ))
+        if position is not None:
+            queryset = queryset.filter(
+                self.seek_filter(fields, position, reverse)
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = has_more if reverse else position is not None
+        self.fields = fields
+        self.page_items = results
+        return results
+
+    @staticmethod
+    def seek_filter(fields, position, reverse):
+        """Условие для строк, идущих после позиции в порядке сортировки."""
+        condition = Q()
+        equal = {}
+        for (name, desc), value in zip(fields, position):
+            lookup = 'lt' if desc != reverse else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def decode_cursor(self, request, model):
+        """Позиция и направление из курсора.
+
+        Значения позиции приводятся к типам полей сортировки модели, так что
+        изменённый вручную курсор даёт 404, а не ошибку в запросе к БД.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position, reverse = cursor['p'], bool(cursor['r'])
+            if not isinstance(position, list) or (
+                    len(position) != len(self.ordering)):
+                raise ValueError
+            position = [
+                model._meta.get_field(name.lstrip('-')).to_python(value)
+                for name, value in zip(self.ordering, position)
+            ]
+            if None in position:
+                raise ValueError
+        except (binascii.Error, ValueError, TypeError, KeyError,
+                ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, item, reverse):
+        position = [str(getattr(item, name)) for name, _ in self.fields]
+        encoded = base64.urlsafe_b64encode(
+            json.dumps({'p': position, 'r': int(reverse)}).encode()
+        ).decode()
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.has_next or not self.page_items:
+            return None
+        return self.encode_cursor(self.page_items[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page_items:
+            return None
+        return self.encode_cursor(self.page_items[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+
+class TitlePagination(KeysetPagination):
+    ordering = ('-id',)
+
+
+class PubDatePagination(KeysetPagination):
+    ordering = ('-pub_date', '-id')
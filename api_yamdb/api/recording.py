@@ -0,0 +1,99 @@
+import json
+import threading
+
+ANONYMOUS = 'anon'
+
+# Значения этих полей тела в журнал не попадают
+SENSITIVE_FIELDS = frozenset(
+    ('confirmation_code', 'password', 'token', 'refresh', 'access')
+)
+MASK = '***'
+
+
+def user_role(user):
+    """Роль пользователя для журнала: anon, user, moderator или admin."""
+    if not user.is_authenticated:
+        return ANONYMOUS
+    if user.is_superuser:
+        return user.ADMIN
+    return user.role
+
+
+def mask_sensitive(data):
+    if isinstance(data, dict):
+        return {
+            key: MASK if key in SENSITIVE_FIELDS else mask_sensitive(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [mask_sensitive(item) for item in data]
+    return data
+
+
+def request_body(request, max_size):
+    """Тело запроса JSON без секретов или None, если его не записать.
+
+    Тела других типов и больше max_size байт не читаются.
+    """
+    try:
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        return None
+    if not length or length > max_size or (
+            request.content_type != 'application/json'):
+        return None
+    try:
+        return mask_sensitive(json.loads(request.body))
+    except ValueError:
+        return None
+
+
+def make_record(request, body, response, started, duration):
+    """Запись журнала с короткими ключами.
+
+    t - время начала (unix), m - метод, p - путь, q - строка запроса,
+    b - тело JSON, r - роль, v - имя маршрута, s - статус ответа,
+    d - длительность в мс.
+    """
+    match = request.resolver_match
+    record = {
+        't': round(started, 3),
+        'm': request.method,
+        'p': request.path,
+        'q': request.META.get('QUERY_STRING', ''),
+        'r': user_role(request.user),
+        'v': match.view_name if match else None,
+        's': response.status_code,
+        'd': round(duration * 1000, 2),
+    }
+    if body is not None:
+        record['b'] = body
+    return record
+
+
+class RequestLog:
+    """Журнал запросов в формате NDJSON, дописываемый из разных потоков.
+
+    Каждая запись пишется одним вызовом write() в файл, открытый на
+    дозапись, так что строки нескольких процессов не перемешиваются.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        with self.lock:
+            if self.file is None:
+                self.file = open(self.path, 'a', encoding='utf-8',
+                                 buffering=1)
+            self.file.write(line + '\n')
+
+
+def read_log(path):
+    """Записи журнала по порядку времени начала."""
+    with open(path, encoding='utf-8') as file:
+        records = [json.loads(line) for line in file if line.strip()]
+    return sorted(records, key=lambda record: record['t'])
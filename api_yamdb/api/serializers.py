@@ -1,9 +1,22 @@
-from django.core.exceptions import ValidationError
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer, SlugRelatedField
 
 from reviews.models import Category, Comment, Genre, Review, Title, User
 from core.user_validation import check_name
+from .cache import LOOKUP_CACHES
+from .utils import get_includes
+
+
+class CachedSlugRelatedField(SlugRelatedField):
+    """Поле, разрешающее slug через кэш справочника без запроса к БД."""
+
+    def to_internal_value(self, data):
+        lookup_cache = LOOKUP_CACHES[self.get_queryset().model]
+        obj = lookup_cache.get(str(data))
+        if obj is None:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=str(data))
+        return obj
 
 
 class UsersSerializer(serializers.ModelSerializer):
@@ -41,6 +54,18 @@ class GetTokenSerializer(serializers.ModelSerializer):
         fields = ('username', 'confirmation_code',)
 
 
+class CommentPreviewSerializer(ModelSerializer):
+    """Сериализатор комментария в превью отзыва."""
+
+    author = serializers.CharField(
+        read_only=True, source='author_username'
+    )
+
+    class Meta:
+        fields = ('id', 'author', 'text', 'pub_date')
+        model = Comment
+
+
 class ReviewSerializer(ModelSerializer):
     """Сериализатор отзывов."""
 
@@ -50,19 +75,29 @@ class ReviewSerializer(ModelSerializer):
     title = SlugRelatedField(
         read_only=True, slug_field='name'
     )
-
-    def validate(self, data):
-        if self.context['request'].method == 'POST':
-            title_id = self.context.get('view').kwargs.get('title_id')
-            user = self.context['request'].user
-            if Review.objects.filter(title_id=title_id, author=user).exists():
-                raise ValidationError('Одно произведение - один отзыв!')
-        return data
+    comment_count = serializers.SerializerMethodField()
+    comments_preview = serializers.SerializerMethodField()
 
     class Meta:
         fields = '__all__'
         model = Review
 
+    def get_fields(self):
+        fields = super().get_fields()
+        if 'comment_previews' not in self.context:
+            fields.pop('comment_count')
+            fields.pop('comments_preview')
+        return fields
+
+    def get_comment_count(self, review):
+        return self.context['comment_previews'].get(review.id, (0, []))[0]
+
+    def get_comments_preview(self, review):
+        _, comments = self.context['comment_previews'].get(
+            review.id, (0, [])
+        )
+        return CommentPreviewSerializer(comments, many=True).data
+
 
 class CommentSerializer(ModelSerializer):
     """Сериализатор комментариев."""
@@ -70,14 +105,24 @@ class CommentSerializer(ModelSerializer):
     author = SlugRelatedField(
         read_only=True, slug_field='username'
     )
-    review = SlugRelatedField(
-        read_only=True, slug_field='text'
+    review = serializers.PrimaryKeyRelatedField(
+        read_only=True
+    )
+    review_excerpt = serializers.CharField(
+        read_only=True
     )
 
     class Meta:
         fields = '__all__'
         model = Comment
 
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or 'review_excerpt' not in get_includes(request):
+            fields.pop('review_excerpt')
+        return fields
+
 
 class CategorySerializer(serializers.ModelSerializer):
     """Сериализатор категорий."""
@@ -104,19 +149,19 @@ class GenreSerializer(serializers.ModelSerializer):
 class TitleWriteSerializer(serializers.ModelSerializer):
     """Сериализатор произведений."""
 
-    genre = serializers.SlugRelatedField(
+    genre = CachedSlugRelatedField(
         queryset=Genre.objects.all(),
         slug_field="slug",
         many=True
     )
-    category = serializers.SlugRelatedField(
+    category = CachedSlugRelatedField(
         queryset=Category.objects.all(),
         slug_field="slug"
     )
 
     class Meta:
         model = Title
-        fields = "__all__"
+        fields = ("id", "name", "year", "description", "genre", "category")
 
 
 class TitleReadSerializer(serializers.ModelSerializer):
@@ -129,10 +174,80 @@ class TitleReadSerializer(serializers.ModelSerializer):
     category = CategorySerializer(
         read_only=True
     )
-    rating = serializers.IntegerField(
+    rating = serializers.FloatField(
         read_only=True
     )
 
     class Meta:
         model = Title
-        fields = "__all__"
+        fields = (
+            "id", "name", "year", "rating", "description", "genre", "category"
+        )
+
+
+class TitleStatsSerializer(serializers.ModelSerializer):
+    """Сериализатор статистики оценок произведения."""
+
+    count = serializers.IntegerField(
+        source="review_count"
+    )
+    mean = serializers.FloatField(
+        source="rating"
+    )
+    median = serializers.FloatField(
+        source="median_score"
+    )
+    distribution = serializers.DictField(
+        source="score_distribution",
+        child=serializers.IntegerField()
+    )
+
+    class Meta:
+        model = Title
+        fields = ("id", "count", "mean", "median", "distribution")
+
+
+class BulkModerationSerializer(serializers.Serializer):
+    """Сериализатор условий массового удаления отзывов и комментариев."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False
+    )
+    author = serializers.SlugRelatedField(
+        queryset=User.objects.all(),
+        slug_field='username',
+        required=False
+    )
+    title = serializers.IntegerField(
+        min_value=1,
+        required=False
+    )
+    since = serializers.DateTimeField(
+        required=False
+    )
+    until = serializers.DateTimeField(
+        required=False
+    )
+
+    def validate(self, data):
+        if not data:
+            raise serializers.ValidationError(
+                'Укажите ids или хотя бы одно условие отбора.'
+            )
+        return data
+
+    def filter_queryset(self, queryset, title_field):
+        data = self.validated_data
+        lookups = {
+            'id__in': data.get('ids'),
+            'author': data.get('author'),
+            title_field: data.get('title'),
+            'pub_date__gte': data.get('since'),
+            'pub_date__lt': data.get('until'),
+        }
+        return queryset.filter(**{
+            lookup: value for lookup, value in lookups.items()
+            if value is not None
+        })
@@ -0,0 +1,45 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title, User)
+from reviews.signals import bulk_written
+from .cache import bump_versions_once
+
+# Модели, по версиям которых строятся ключи кэша и ETag
+VERSIONED_MODELS = (Category, Comment, Genre, Review, Title, User)
+
+# Записи этих моделей меняют и данные произведений: связи с жанрами
+# удаляются каскадом без сигналов, а категория обнуляется через UPDATE
+TITLE_DEPENDENCIES = (Category, Genre, GenreTitle)
+
+
+def affected_models(model):
+    models = {model} if model in VERSIONED_MODELS else set()
+    if model in TITLE_DEPENDENCIES:
+        models.add(Title)
+    return models
+
+
+@receiver(bulk_written)
+def invalidate_model_cache(sender, **kwargs):
+    """Сбрасывает кэш модели после записи.
+
+    Приёмники подключены только к моделям с версиями, поэтому удаление
+    строк остальных моделей по-прежнему идёт без выборки (fast delete).
+    """
+    bump_versions_once(affected_models(sender))
+
+
+for versioned_model in VERSIONED_MODELS:
+    post_save.connect(invalidate_model_cache, sender=versioned_model)
+    post_delete.connect(invalidate_model_cache, sender=versioned_model)
+
+
+@receiver(m2m_changed, sender=GenreTitle)
+def invalidate_relation_cache(sender, instance, model, action, **kwargs):
+    """Сбрасывает кэш обеих сторон изменённой связи жанров."""
+    if action.startswith('post_'):
+        bump_versions_once(
+            affected_models(type(instance)) | affected_models(model)
+        )
@@ -0,0 +1,89 @@
+import json
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+logger = logging.getLogger('api.timing')
+
+# Замеры текущего запроса; None - инструментирование выключено
+current_timing = ContextVar('server_timing', default=None)
+
+
+class ServerTiming:
+    """Время фаз одного запроса и запросов к БД.
+
+    Фазы могут пересекаться с db: запросы, выполненные при сериализации,
+    входят и в serialize, и в db.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = defaultdict(float)
+        self.queries = 0
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += time.perf_counter() - started
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка connection.execute_wrapper для учёта запросов к БД."""
+        self.queries += 1
+        with self.phase('db'):
+            return execute(sql, params, many, context)
+
+    def metrics(self):
+        """{метрика: мс}, начиная с total."""
+        metrics = {'total': (time.perf_counter() - self.started) * 1000}
+        metrics.update(
+            (name, duration * 1000) for name, duration in self.phases.items()
+        )
+        return metrics
+
+    def header(self, metrics):
+        """Значение заголовка Server-Timing."""
+        return ', '.join(
+            f'{name};dur={duration:.2f}' + (
+                f';desc="{self.queries} queries"' if name == 'db' else ''
+            )
+            for name, duration in metrics.items()
+        )
+
+    def log(self, request, response, metrics):
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': self.queries,
+            **{f'{name}_ms': round(duration, 2)
+               for name, duration in metrics.items()},
+        }))
+
+
+def timed(name):
+    """Контекст замера фазы name; без активных замеров ничего не делает."""
+    timing = current_timing.get()
+    return timing.phase(name) if timing is not None else nullcontext()
+
+
+def timed_serializer(serializer):
+    """Засчитывает to_representation корневого сериализатора в serialize.
+
+    Вложенные сериализаторы не оборачиваются, их время уже внутри.
+    """
+    timing = current_timing.get()
+    if timing is None:
+        return serializer
+    to_representation = serializer.to_representation
+
+    def timed_to_representation(*args, **kwargs):
+        with timing.phase('serialize'):
+            return to_representation(*args, **kwargs)
+
+    serializer.to_representation = timed_to_representation
+    return serializer
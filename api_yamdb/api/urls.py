@@ -1,8 +1,9 @@
 from django.urls import include, path
 from rest_framework import routers
-from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    GetTokenView, ReviewViewSet, SignUpView, TitleViewSet,
-                    UsersViewSet)
+from .views import (CategoryViewSet, CommentBulkModerationView,
+                    CommentViewSet, ExportView, GenreViewSet, GetTokenView,
+                    ReviewBulkModerationView, ReviewViewSet, SignUpView,
+                    TitleViewSet, UsersViewSet)
 
 router_v1 = routers.DefaultRouter()
 router_v1.register(r'users', UsersViewSet)
@@ -42,7 +43,22 @@ router_v1.register(
     basename='titles'
 )
 
+moderation_urls = [
+    path(
+        'reviews/',
+        ReviewBulkModerationView.as_view(),
+        name='moderation-reviews'
+    ),
+    path(
+        'comments/',
+        CommentBulkModerationView.as_view(),
+        name='moderation-comments'
+    ),
+]
+
 urlpatterns = [
     path('v1/auth/', include(auth_urls)),
+    path('v1/moderation/', include(moderation_urls)),
+    path('v1/export/<str:file_name>', ExportView.as_view(), name='export'),
     path('v1/', include(router_v1.urls)),
 ]
@@ -19,3 +19,13 @@ def get_token_for_user(user):
     refresh = RefreshToken.for_user(user)
 
     return str(refresh.access_token)
+
+
+def get_includes(request):
+    """Функция для получения набора опциональных блоков из ?include=."""
+    return {
+        item.strip()
+        for value in request.query_params.getlist('include')
+        for item in value.split(',')
+        if item.strip()
+    }
@@ -1,32 +1,56 @@
+from urllib.parse import urlencode
+
+from django.conf import settings
 from django.conf.global_settings import DEFAULT_FROM_EMAIL
+from django.core.cache import cache
 from django.core.mail import send_mail
-from django.db.models import Avg
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError
+from django.db.models.functions import Substr
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, views, viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-
-from .filters import TitleFilter
-from .mixins import CustomMixin
-from .permissions import IsAdministrator, IsAdminOrReadOnly, IsOwnerOrReadOnly
-from .serializers import (CategorySerializer, CommentSerializer,
-                          GenreSerializer, GetTokenSerializer,
-                          ReviewSerializer, SingUpSerializer,
-                          TitleReadSerializer, TitleWriteSerializer,
+from rest_framework.settings import api_settings
+
+from .cache import category_cache, genre_cache, versioned_key
+from .filters import TitleFilter, count_facets
+from .metrics import (CONTENT_TYPE, EMAIL_DURATION, cache_result, registry,
+                      render)
+from .mixins import (ConditionalGetMixin, CustomMixin, NestedParentMixin,
+                     ServerTimingMixin)
+from .pagination import (CountedPagination, PubDatePagination,
+                         TitlePagination)
+from .permissions import (IsAdministrator, IsAdminOrReadOnly, IsModerator,
+                          IsOwnerOrReadOnly)
+from .serializers import (BulkModerationSerializer, CategorySerializer,
+                          CommentSerializer, GenreSerializer,
+                          GetTokenSerializer, ReviewSerializer,
+                          SingUpSerializer, TitleReadSerializer,
+                          TitleStatsSerializer, TitleWriteSerializer,
                           UsersSerializer)
-from reviews.models import Category, Genre, Review, Title, User
-from .utils import check_token, get_token_for_user, make_token
+from reviews.csv_export import CSV_COLUMNS, EXPORT_FORMATS, stream_export
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.services import (bulk_delete_comments, bulk_delete_reviews,
+                              comment_previews, create_review, delete_review,
+                              update_review)
+from .utils import (check_token, get_includes, get_token_for_user,
+                    make_token)
+
 
+def metrics(request):
+    """Метрики всех процессов в текстовом формате Prometheus."""
+    return HttpResponse(render(registry), content_type=CONTENT_TYPE)
 
-class UsersViewSet(viewsets.ModelViewSet):
+
+class UsersViewSet(ServerTimingMixin, viewsets.ModelViewSet):
     """Пользователи."""
 
     queryset = User.objects.all()
     permission_classes = (IsAdministrator,)
-    pagination_class = PageNumberPagination
+    pagination_class = CountedPagination
     serializer_class = UsersSerializer
     lookup_field = 'username'
     filter_backends = (filters.SearchFilter,)
@@ -56,7 +80,7 @@ class UsersViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class SignUpView(views.APIView):
+class SignUpView(ServerTimingMixin, views.APIView):
     """Регистрация пользователя."""
 
     permission_classes = (AllowAny,)
@@ -64,14 +88,15 @@ class SignUpView(views.APIView):
     @staticmethod
     def send_confirmation_code(user):
         confirmation_code = make_token(user)
-        send_mail(
-            subject='Код подтверждения для регистрации',
-            message=f'Код подтверждения для пользователя {user.username}:'
-                    f' {confirmation_code}',
-            from_email=DEFAULT_FROM_EMAIL,
-            recipient_list=[f'{user.email}'],
-            fail_silently=False
-        )
+        with EMAIL_DURATION.time():
+            send_mail(
+                subject='Код подтверждения для регистрации',
+                message=f'Код подтверждения для пользователя {user.username}:'
+                        f' {confirmation_code}',
+                from_email=DEFAULT_FROM_EMAIL,
+                recipient_list=[f'{user.email}'],
+                fail_silently=False
+            )
 
     def post(self, request):
         if User.objects.filter(username=request.data.get('username'),
@@ -88,7 +113,7 @@ class SignUpView(views.APIView):
             return Response(request.data, status=status.HTTP_200_OK)
 
 
-class GetTokenView(views.APIView):
+class GetTokenView(ServerTimingMixin, views.APIView):
     """Получение токена."""
 
     permission_classes = (AllowAny,)
@@ -111,72 +136,233 @@ class GetTokenView(views.APIView):
             status=status.HTTP_400_BAD_REQUEST)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class BulkModerationView(ServerTimingMixin, views.APIView):
+    """Массовое удаление отзывов или комментариев модератором."""
+
+    permission_classes = (IsModerator,)
+    queryset = None
+    title_field = None
+    delete_objects = None
+
+    def post(self, request):
+        serializer = BulkModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        queryset = serializer.filter_queryset(
+            self.queryset.all(), self.title_field
+        )
+        deleted = self.delete_objects(
+            queryset, settings.MODERATION_CHUNK_SIZE
+        )
+        return Response({'deleted': deleted}, status=status.HTTP_200_OK)
+
+
+class ReviewBulkModerationView(BulkModerationView):
+    queryset = Review.objects.all()
+    title_field = 'title_id'
+    delete_objects = staticmethod(bulk_delete_reviews)
+
+
+class CommentBulkModerationView(BulkModerationView):
+    queryset = Comment.objects.all()
+    title_field = 'review__title_id'
+    delete_objects = staticmethod(bulk_delete_comments)
+
+
+class ExportView(ServerTimingMixin, views.APIView):
+    """Потоковая выгрузка файла данных в формате CSV или NDJSON."""
+
+    permission_classes = (IsAdministrator,)
+    content_types = {
+        'csv': 'text/csv; charset=utf-8',
+        'ndjson': 'application/x-ndjson; charset=utf-8',
+    }
+
+    def get(self, request, file_name):
+        stem, _, export_format = file_name.rpartition('.')
+        source = f'{stem}.csv'
+        if source not in CSV_COLUMNS or export_format not in EXPORT_FORMATS:
+            raise Http404
+        response = StreamingHttpResponse(
+            stream_export(source, export_format, settings.EXPORT_CHUNK_SIZE),
+            content_type=self.content_types[export_format]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{file_name}"'
+        )
+        return response
+
+
+class ReviewViewSet(ServerTimingMixin, ConditionalGetMixin,
+                    NestedParentMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = PubDatePagination
+    etag_models = (Review, Comment, Title, User)
     permission_classes = (IsOwnerOrReadOnly,)
+    parent_queryset = Title.objects.all()
+    parent_lookup_kwargs = {'pk': 'title_id'}
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return self.get_parent().reviews.select_related('author')
+
+    def get_preview_size(self):
+        try:
+            size = int(self.request.query_params.get(
+                'preview_size', settings.COMMENTS_PREVIEW_SIZE
+            ))
+        except ValueError:
+            raise ValidationError({'preview_size': 'Ожидается целое число.'})
+        return min(max(size, 0), settings.COMMENTS_PREVIEW_MAX_SIZE)
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if 'comments_preview' in get_includes(self.request):
+            reviews = page if page is not None else queryset
+            self.comment_previews = comment_previews(
+                [review.id for review in reviews], self.get_preview_size()
+            )
+        return page
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if hasattr(self, 'comment_previews'):
+            context['comment_previews'] = self.comment_previews
+        return context
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        try:
+            create_review(
+                serializer,
+                title_id=self.kwargs.get('title_id'),
+                author=self.request.user
+            )
+        except Title.DoesNotExist:
+            raise Http404
+        except IntegrityError:
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Одно произведение - один отзыв!'
+                ]
+            })
+
+    def perform_update(self, serializer):
+        update_review(serializer)
+
+    def perform_destroy(self, instance):
+        delete_review(instance)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ServerTimingMixin, ConditionalGetMixin,
+                     NestedParentMixin, viewsets.ModelViewSet):
     """Комментарии."""
 
     serializer_class = CommentSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = PubDatePagination
+    etag_models = (Comment, Review, User)
     permission_classes = (IsOwnerOrReadOnly,)
-
-    def get_review(self):
-        return get_object_or_404(
-            Review,
-            pk=self.kwargs.get('review_id'),
-            title__id=self.kwargs.get('title_id'))
+    parent_queryset = Review.objects.all()
+    parent_lookup_kwargs = {'pk': 'review_id', 'title_id': 'title_id'}
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        queryset = self.get_parent().comments.select_related('author')
+        if 'review_excerpt' in get_includes(self.request):
+            queryset = queryset.annotate(review_excerpt=Substr(
+                'review__text', 1, settings.REVIEW_EXCERPT_LENGTH
+            ))
+        return queryset
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, review=self.get_review())
+        serializer.save(author=self.request.user, review=self.get_parent())
 
 
 class CategoryViewSet(CustomMixin):
     """Категории."""
 
     queryset = Category.objects.all()
+    lookup_cache = category_cache
+    etag_models = (Category,)
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = CountedPagination
 
 
 class GenreViewSet(CustomMixin):
     """Жанры."""
 
     queryset = Genre.objects.all()
+    lookup_cache = genre_cache
+    etag_models = (Genre,)
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = CountedPagination
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ServerTimingMixin, ConditionalGetMixin,
+                   viewsets.ModelViewSet):
     """Произведения."""
 
     queryset = (
-        Title.objects.all()
-        .annotate(rating=Avg("reviews__score"))
+        Title.objects.select_related("category")
+        .prefetch_related("genre")
         .order_by("-id")
     )
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = [DjangoFilterBackend]
-    pagination_class = PageNumberPagination
+    pagination_class = TitlePagination
     filterset_class = TitleFilter
+    etag_models = (Title, Genre, Category, Review)
+    conditional_actions = ("list", "retrieve", "stats", "top")
+    leaderboards = {
+        "rating": ("-rating", "-review_count", "-id"),
+        "reviews": ("-review_count", "-rating", "-id"),
+    }
 
     def get_serializer_class(self):
+        if self.action == "top":
+            return TitleReadSerializer
+        if self.action == "stats":
+            return TitleStatsSerializer
         if self.request.method in ["POST", "PATCH"]:
             return TitleWriteSerializer
         return TitleReadSerializer
+
+    @action(detail=True, methods=["GET"])
+    def stats(self, request, pk=None):
+        serializer = self.get_serializer(self.get_object())
+        return Response(serializer.data)
+
+    @action(detail=False, methods=["GET"])
+    def top(self, request):
+        by = request.query_params.get("by", "rating")
+        if by not in self.leaderboards:
+            raise ValidationError(
+                {"by": f"Допустимые значения: {', '.join(self.leaderboards)}"}
+            )
+        try:
+            limit = min(
+                int(request.query_params.get("limit", settings.TOP_SIZE)),
+                settings.TOP_MAX_SIZE
+            )
+        except ValueError:
+            raise ValidationError({"limit": "Ожидается целое число."})
+        queryset = (
+            self.filter_queryset(self.get_queryset())
+            .filter(review_count__gt=0)
+            .order_by(*self.leaderboards[by])[:max(limit, 0)]
+        )
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=["GET"])
+    def facets(self, request):
+        params = urlencode(sorted(
+            (key, value) for key, values in request.query_params.lists()
+            if key in self.filterset_class.base_filters
+            for value in values
+        ))
+        key = versioned_key("facets", [Title, Genre, Category], params)
+        facets = cache.get(key)
+        cache_result("facets", facets is not None)
+        if facets is None:
+            facets = count_facets(self.filter_queryset(self.get_queryset()))
+            cache.set(key, facets, settings.FACETS_CACHE_TIMEOUT)
+        return Response(facets)
@@ -30,6 +30,8 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -37,6 +39,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.DataVersionMiddleware',
+    'api.middleware.RequestRecordMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -118,10 +122,59 @@ CSV_FILE_PATH = os.path.join(BASE_DIR, 'static/data')
 CHARS_LENGTH = 15
 
 
+# Cache
+
+# Кэш у каждого процесса свой, но ключи кэша и ETag строятся по версиям
+# данных из таблицы reviews.DataVersion, общей для всех процессов. Поэтому
+# запись в любом процессе делает устаревшими значения во всех остальных.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+COUNT_CACHE_TIMEOUT = 30
+
+FACETS_CACHE_TIMEOUT = 60
+
+TOP_SIZE = 10
+
+TOP_MAX_SIZE = 100
+
+REVIEW_EXCERPT_LENGTH = 100
+
+COMMENTS_PREVIEW_SIZE = 3
+
+COMMENTS_PREVIEW_MAX_SIZE = 10
+
+MODERATION_CHUNK_SIZE = 500
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Журнал запросов для replay_requests; None - не записывать
+REQUEST_LOG_FILE = None
+
+REQUEST_LOG_SAMPLE_RATE = 0.01
+
+REQUEST_LOG_MAX_BODY_SIZE = 10000
+
+# Заголовок Server-Timing и лог api.timing с временем фаз запроса
+SERVER_TIMING = False
+
+# Метрики Prometheus на /metrics
+METRICS_ENABLED = True
+
+# Каталог для снимков метрик процессов (несколько worker-процессов);
+# очищается при каждом перезапуске сервиса
+METRICS_DIR = None
+
+METRICS_FLUSH_INTERVAL = 5
+
+
 # REST integration
 
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.CountedPagination',
     'PAGE_SIZE': 5,
 
     'DEFAULT_PERMISSION_CLASSES': [
@@ -141,6 +194,24 @@ SIMPLE_JWT = {
 }
 
 
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+
 # Email settings
 
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
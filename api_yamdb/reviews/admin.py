@@ -1,13 +1,19 @@
 from django.contrib import admin
 
-from .models import Category, Genre, Title, User
+from .models import Category, Genre, GenreTitle, Title, User
 
 admin.site.register(User)
 
 
+class GenreTitleInline(admin.TabularInline):
+    model = GenreTitle
+    extra = 1
+
+
 @admin.register(Title)
 class TitleAdmin(admin.ModelAdmin):
     list_display = ('name', 'description', 'category', 'get_genre')
+    inlines = (GenreTitleInline,)
     empty_value_display = '-пусто-'
 
     def get_genre(self, title):
@@ -0,0 +1,120 @@
+import csv
+import json
+from contextlib import contextmanager
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+from .csv_import import CSV_FILES
+
+# Столбцы файлов в том же порядке, что и в static/data
+CSV_COLUMNS = {
+    'users.csv': (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'
+    ),
+    'category.csv': ('id', 'name', 'slug'),
+    'genre.csv': ('id', 'name', 'slug'),
+    'titles.csv': ('id', 'name', 'year', 'category'),
+    'genre_title.csv': ('id', 'title_id', 'genre_id'),
+    'review.csv': ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    'comments.csv': ('id', 'review_id', 'text', 'author', 'pub_date'),
+}
+
+# NDJSON не привязан к формату static/data, поэтому в нём есть и поля,
+# которых нет в исходных CSV. Выгрузка в CSV теряет описания произведений
+NDJSON_COLUMNS = {
+    **CSV_COLUMNS,
+    'titles.csv': CSV_COLUMNS['titles.csv'] + ('description',),
+}
+
+EXPORT_COLUMNS = {'csv': CSV_COLUMNS, 'ndjson': NDJSON_COLUMNS}
+
+EXPORT_FORMATS = tuple(EXPORT_COLUMNS)
+
+encoder = DjangoJSONEncoder()
+
+
+class Echo:
+    """Буфер для csv.writer, возвращающий записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+@contextmanager
+def snapshot():
+    """Транзакция только для чтения, видящая один снимок данных.
+
+    В SQLite снимок держит сама транзакция, в PostgreSQL нужен уровень
+    изоляции REPEATABLE READ.
+    """
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ '
+                    'READ ONLY'
+                )
+        yield
+
+
+def export_rows(file_name, columns, chunk_size):
+    """Значения столбцов columns модели файла, по возрастанию ключа."""
+    model = CSV_FILES[file_name]
+    attnames = [
+        # используется защищенный атрибут _meta
+        model._meta.get_field(column).attname
+        for column in columns
+    ]
+    return (
+        model.objects.order_by('pk').values_list(*attnames)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def to_text(value):
+    """Даты - в ISO 8601, как в JSON; None csv.writer пишет пустой строкой.
+    """
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return encoder.default(value)
+
+
+def render_csv(columns, rows):
+    """Строки файла CSV по одной, начиная с заголовка."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([to_text(value) for value in row])
+
+
+def render_ndjson(columns, rows):
+    """Строки NDJSON: по объекту с ключами-столбцами на строку."""
+    for row in rows:
+        yield json.dumps(
+            dict(zip(columns, row)), cls=DjangoJSONEncoder,
+            ensure_ascii=False
+        ) + '\n'
+
+
+RENDERERS = {'csv': render_csv, 'ndjson': render_ndjson}
+
+
+def export_file(file_name, export_format, chunk_size):
+    """Потоково выгружает файл в формате export_format.
+
+    Вызывается внутри snapshot().
+    """
+    columns = EXPORT_COLUMNS[export_format][file_name]
+    return RENDERERS[export_format](
+        columns, export_rows(file_name, columns, chunk_size)
+    )
+
+
+def stream_export(file_name, export_format, chunk_size):
+    """То же, что export_file, но со своей транзакцией-снимком.
+
+    Транзакция открыта, пока генератор не исчерпан или не закрыт.
+    """
+    with snapshot():
+        yield from export_file(file_name, export_format, chunk_size)
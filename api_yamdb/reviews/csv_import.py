@@ -0,0 +1,343 @@
+import csv
+import hashlib
+import json
+import os
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from itertools import count, islice
+from pathlib import Path
+
+import django
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .models import (Category, Comment, Genre, GenreTitle, ImportManifest,
+                     Review, Title)
+from .signals import bulk_written
+
+User = get_user_model()
+
+DEFAULT_BATCH_SIZE = 1000
+CHECKSUM_BLOCK_SIZE = 1 << 20
+
+CSV_FILES = {
+    'users.csv': User,
+    'category.csv': Category,
+    'genre.csv': Genre,
+    'titles.csv': Title,
+    'genre_title.csv': GenreTitle,
+    'review.csv': Review,
+    'comments.csv': Comment,
+}
+
+# Поле со ссылкой на произведение у моделей, запись которых меняет
+# рейтинг произведения или его поисковый индекс
+TITLE_FIELDS = {
+    Title: 'id',
+    Review: 'title_id',
+}
+
+
+class CsvImportError(Exception):
+    """Ошибка в данных файла CSV."""
+
+
+def import_stages(files=CSV_FILES):
+    """Разбивает файлы на этапы по внешним ключам моделей.
+
+    Модели одного этапа не ссылаются друг на друга и импортируются
+    одновременно, каждый этап - после всех, от которых он зависит.
+    """
+    dependencies = {
+        name: {
+            # используется защищенный атрибут _meta
+            field.related_model for field in model._meta.concrete_fields
+            if field.is_relation and field.related_model is not model
+        }
+        for name, model in files.items()
+    }
+    done, stages = set(), []
+    while len(done) < len(files):
+        stage = [
+            name for name, model in files.items()
+            if model not in done
+            and dependencies[name] & set(files.values()) <= done
+        ]
+        if not stage:
+            raise CsvImportError('Циклическая зависимость между файлами.')
+        done.update(files[name] for name in stage)
+        stages.append(stage)
+    return stages
+
+
+def build_converters(model, header):
+    """Для каждого столбца CSV - имя атрибута модели и функция приведения.
+
+    Внешние ключи записываются напрямую в `<поле>_id`, без запросов к БД.
+    """
+    converters = []
+    for column in header:
+        field = model._meta.get_field(column)
+        target = field.target_field if field.is_relation else field
+        converters.append((field.attname, target.to_python, field.null))
+    return converters
+
+
+def parse_rows(label, header, rows, first):
+    """Приводит строки CSV к значениям полей модели.
+
+    Выполняется в процессе-обработчике, поэтому модель передаётся
+    по метке, а результат - словарями значений.
+    """
+    converters = build_converters(apps.get_model(label), header)
+    parsed = []
+    for number, row in enumerate(rows, start=first):
+        if len(row) != len(converters):
+            raise CsvImportError(
+                f'запись {number}: ожидалось {len(converters)} столбцов, '
+                f'получено {len(row)}'
+            )
+        try:
+            parsed.append({
+                attname: None if value == '' and null else to_python(value)
+                for (attname, to_python, null), value in zip(converters, row)
+            })
+        except ValidationError as error:
+            raise CsvImportError(f'запись {number}: {"; ".join(error)}')
+    return parsed
+
+
+@contextmanager
+def keep_dates(model, attnames):
+    """Отключает auto_now/auto_now_add у полей, значения которых есть в CSV.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if field.attname in attnames
+        and (getattr(field, 'auto_now', False)
+             or getattr(field, 'auto_now_add', False))
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class SerialExecutor:
+    """Заменяет пул процессов при workers=1: разбор идёт в текущем процессе.
+    """
+
+    def submit(self, func, *args):
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def setup_worker():
+    if not apps.ready:
+        django.setup()
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(CHECKSUM_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_hash(header, rows):
+    return hashlib.sha256(
+        json.dumps([header, rows], ensure_ascii=False).encode()
+    ).hexdigest()
+
+
+def read_batches(path, model, stack, batch_size, known, manifest, stats):
+    """Потоково читает файл и отдаёт задания на разбор пачками строк.
+
+    Пачки, хэш которых совпал с хэшем из known, пропускаются.
+    Хэши всех пачек дописываются в manifest['chunks'].
+    """
+    reader = csv.reader(stack.enter_context(
+        open(path, newline='', encoding='utf-8')
+    ))
+    header = next(reader)
+    converters = build_converters(model, header)
+    if model._meta.pk.attname not in {name for name, _, _ in converters}:
+        raise CsvImportError(
+            f'{path.name}: нет столбца первичного ключа '
+            f'`{model._meta.pk.attname}`.'
+        )
+    stack.enter_context(
+        keep_dates(model, {attname for attname, _, _ in converters})
+    )
+    first = 1
+    for index in count():
+        rows = list(islice(reader, batch_size))
+        if not rows:
+            return
+        checksum = chunk_hash(header, rows)
+        manifest['chunks'].append(checksum)
+        manifest['rows'] += len(rows)
+        stats['read'] += len(rows)
+        if index < len(known) and known[index] == checksum:
+            stats['skipped'] += len(rows)
+        else:
+            yield model._meta.label, header, rows, first
+        first += len(rows)
+
+
+def upsert_rows(model, rows):
+    """Добавляет новые строки и обновляет изменившиеся.
+
+    Существующие объекты выбираются одним запросом по первичным ключам,
+    строки с теми же значениями не перезаписываются.
+    Возвращает (добавлено, обновлено, id затронутых произведений): для
+    моделей из TITLE_FIELDS - до и после изменения, для остальных - пусто.
+    """
+    pk_name = model._meta.pk.attname
+    title_field = TITLE_FIELDS.get(model)
+    existing = model.objects.in_bulk([row[pk_name] for row in rows])
+    created, changed, fields, title_ids = [], [], set(), set()
+    for row in rows:
+        instance = existing.get(row[pk_name])
+        if instance is None:
+            created.append(model(**row))
+            continue
+        diff = {
+            attname: value for attname, value in row.items()
+            if getattr(instance, attname) != value
+        }
+        if diff:
+            if title_field is not None:
+                title_ids.add(getattr(instance, title_field))
+            for attname, value in diff.items():
+                setattr(instance, attname, value)
+            changed.append(instance)
+            fields.update(diff)
+    model.objects.bulk_create(created)
+    if changed:
+        model.objects.bulk_update(changed, fields)
+    if title_field is not None:
+        title_ids.update(
+            getattr(instance, title_field) for instance in created + changed
+        )
+    return len(created), len(changed), title_ids
+
+
+def open_sources(path, names, stack, batch_size, manifests, stats):
+    """Очередь (файл, модель, задания) для файлов, изменившихся с прошлого
+    импорта. Новые манифесты этих файлов заполняются в manifests.
+    """
+    previous = ImportManifest.objects.in_bulk(names, field_name='file_name')
+    sources = deque()
+    for name in names:
+        file_path = Path(path) / name
+        checksum = file_checksum(file_path)
+        manifest = previous.get(name)
+        known = []
+        if manifest is not None and manifest.batch_size == batch_size:
+            if manifest.checksum == checksum:
+                stats[name]['read'] = stats[name]['skipped'] = manifest.rows
+                continue
+            known = manifest.chunks
+        manifests[name] = {
+            'checksum': checksum, 'batch_size': batch_size,
+            'chunks': [], 'rows': 0,
+        }
+        sources.append((name, CSV_FILES[name], read_batches(
+            file_path, CSV_FILES[name], stack, batch_size, known,
+            manifests[name], stats[name]
+        )))
+    return sources
+
+
+def parse_batches(sources, executor, workers):
+    """Разбирает пачки всех файлов параллельно, по очереди из каждого.
+
+    Отдаёт (файл, модель, строки) в порядке чтения.
+    """
+    pending = deque()
+    while sources or pending:
+        while sources and len(pending) < 2 * workers:
+            name, model, batches = sources.popleft()
+            task = next(batches, None)
+            if task is not None:
+                pending.append(
+                    (name, model, executor.submit(parse_rows, *task))
+                )
+                sources.append((name, model, batches))
+        if not pending:
+            return
+        name, model, future = pending.popleft()
+        try:
+            yield name, model, future.result()
+        except CsvImportError as error:
+            raise CsvImportError(f'{name}, {error}')
+
+
+def import_stage(path, names, executor, workers, batch_size):
+    """Импортирует файлы одного этапа в одной транзакции.
+
+    Файлы и пачки строк, не изменившиеся с прошлого импорта, пропускаются
+    по манифесту. Остальные пачки всех файлов этапа разбираются
+    параллельно, а записываются в БД последовательно, в порядке чтения.
+    В очереди не больше 2 * workers пачек, так что файл целиком в памяти
+    не держится.
+    Возвращает словарь {файл: Counter(read, skipped, created, updated)}
+    и множество id произведений, рейтинг или индекс которых устарел.
+    """
+    stats = {name: Counter() for name in names}
+    manifests, title_ids = {}, set()
+    with ExitStack() as stack, transaction.atomic():
+        sources = open_sources(
+            path, names, stack, batch_size, manifests, stats
+        )
+        for name, model, rows in parse_batches(sources, executor, workers):
+            created, updated, affected = upsert_rows(model, rows)
+            title_ids.update(affected)
+            stats[name]['created'] += created
+            stats[name]['updated'] += updated
+        for name, manifest in manifests.items():
+            ImportManifest.objects.update_or_create(
+                file_name=name, defaults=manifest
+            )
+    for name in names:
+        if stats[name]['created'] or stats[name]['updated']:
+            bulk_written.send(sender=CSV_FILES[name])
+    return stats, title_ids
+
+
+def import_csv(path, batch_size=DEFAULT_BATCH_SIZE, workers=None):
+    """Импортирует все файлы CSV по этапам зависимостей.
+
+    Повторный импорт идемпотентен: записываются только изменения.
+    Возвращает итератор троек (этап, статистика, id произведений) из
+    import_stage, этап импортируется при получении следующего элемента.
+    """
+    workers = workers or os.cpu_count() or 1
+    executor = (
+        SerialExecutor() if workers == 1
+        else ProcessPoolExecutor(workers, initializer=setup_worker)
+    )
+    with executor:
+        for stage in import_stages():
+            yield (stage, *import_stage(
+                path, stage, executor, workers, batch_size
+            ))
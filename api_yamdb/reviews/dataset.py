@@ -0,0 +1,247 @@
+import random
+from datetime import datetime, timedelta, timezone
+from itertools import chain, islice
+
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+
+from .models import (MAX_SCORE, MIN_SCORE, Category, Comment, Genre,
+                     GenreTitle, Review, Title, User)
+from .signals import bulk_written
+
+DEFAULT_BATCH_SIZE = 10000
+TEXT_POOL_SIZE = 1024
+
+# Даты отсчитываются от фиксированного момента, чтобы при одном seed
+# данные совпадали побайтно
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+HISTORY = timedelta(days=3650)
+
+WORDS = (
+    'сюжет', 'финал', 'герой', 'атмосфера', 'музыка', 'ритм', 'диалоги',
+    'идея', 'автор', 'стиль', 'темп', 'образ', 'сцена', 'смысл', 'мир',
+    'отлично', 'скучно', 'неожиданно', 'сильно', 'слабо', 'красиво',
+)
+
+
+def zipf_counts(total, size, exponent, limit):
+    """Раскладывает total по size корзинам по закону Ципфа.
+
+    i-я по популярности корзина получает долю 1 / i ** exponent,
+    но не больше limit. Возвращает список количеств по рангам.
+    """
+    weights = [1 / rank ** exponent for rank in range(1, size + 1)]
+    counts = [0] * size
+    remainder = total
+    # Доля корзин, упёршихся в limit, переходит к остальным
+    while remainder > 0:
+        free = [index for index in range(size) if counts[index] < limit]
+        if not free:
+            break
+        scale = remainder / sum(weights[index] for index in free)
+        for index in free:
+            added = min(int(weights[index] * scale), limit - counts[index])
+            counts[index] += added
+            remainder -= added
+        if remainder < len(free):
+            # Остаток от округления - по одному самым популярным
+            for index in free:
+                if remainder and counts[index] < limit:
+                    counts[index] += 1
+                    remainder -= 1
+    return counts
+
+
+def spread(number, period):
+    """Детерминированный псевдослучайный сдвиг в [0, period) по номеру."""
+    return period * (((number * 2654435761) % 2 ** 32) / 2 ** 32)
+
+
+def review_date(review_id):
+    return EPOCH - HISTORY + spread(review_id, HISTORY)
+
+
+def texts(rng, words, size=TEXT_POOL_SIZE):
+    """Набор текстов из words слов, из которого строки выбирают случайно.
+
+    Сборка текста на каждую строку заметно замедляла генерацию.
+    """
+    return [
+        ' '.join(rng.choices(WORDS, k=words)).capitalize() + '.'
+        for _ in range(size)
+    ]
+
+
+def users(rng, count):
+    for i in range(1, count + 1):
+        yield {'id': i, 'username': f'user{i}',
+               'email': f'user{i}@yamdb.fake',
+               'date_joined': EPOCH - HISTORY + spread(i, HISTORY)}
+
+
+def categories(rng, count):
+    for i in range(1, count + 1):
+        yield {'id': i, 'name': f'Категория {i}', 'slug': f'category-{i}'}
+
+
+def genres(rng, count):
+    for i in range(1, count + 1):
+        yield {'id': i, 'name': f'Жанр {i}', 'slug': f'genre-{i}'}
+
+
+def titles(rng, count, category_count):
+    # Популярные категории встречаются чаще
+    weights = [1 / rank for rank in range(1, category_count + 1)]
+    pool = texts(rng, 8)
+    for i in range(1, count + 1):
+        yield {'id': i, 'name': f'Произведение {i}',
+               'year': rng.randint(1900, EPOCH.year - 1),
+               'description': rng.choice(pool),
+               'category_id': rng.choices(
+                   range(1, category_count + 1), weights)[0]}
+
+
+def genre_titles(rng, title_count, genre_count):
+    weights = [1 / rank for rank in range(1, genre_count + 1)]
+    number = 0
+    for title_id in range(1, title_count + 1):
+        chosen = set(rng.choices(
+            range(1, genre_count + 1), weights, k=rng.randint(1, 3)
+        ))
+        for genre_id in sorted(chosen):
+            number += 1
+            yield {'id': number, 'title_id': title_id, 'genre_id': genre_id}
+
+
+def reviews(rng, count, title_count, user_count, exponent):
+    """Отзывы по произведениям с распределением Ципфа.
+
+    Ранги популярности перемешаны, чтобы популярные произведения не шли
+    подряд по id. У каждого произведения авторы отзывов различны.
+    """
+    title_ids = list(range(1, title_count + 1))
+    rng.shuffle(title_ids)
+    counts = zipf_counts(count, title_count, exponent, user_count)
+    pool = texts(rng, 12)
+    number = 0
+    for title_id, size in zip(title_ids, counts):
+        quality = rng.uniform(MIN_SCORE + 1, MAX_SCORE)
+        for author_id in rng.sample(range(1, user_count + 1), size):
+            number += 1
+            score = round(rng.gauss(quality, 2))
+            yield {'id': number, 'title_id': title_id,
+                   'author_id': author_id, 'text': rng.choice(pool),
+                   'score': min(max(score, MIN_SCORE), MAX_SCORE),
+                   'pub_date': review_date(number)}
+
+
+def comments(rng, count, review_count, user_count, burst):
+    """Комментарии ветками: серия ответов вскоре после выбранного отзыва.
+
+    Длина ветки распределена по Парето со средним около burst,
+    поэтому у большинства отзывов комментариев нет, а у некоторых - много.
+    """
+    alpha = burst / (burst - 1) if burst > 1 else 50
+    pool = texts(rng, 6)
+    number = 0
+    while number < count:
+        review_id = rng.randint(1, review_count)
+        size = min(count - number, int(rng.paretovariate(alpha)))
+        moment = review_date(review_id)
+        for _ in range(size):
+            number += 1
+            moment += timedelta(minutes=rng.expovariate(1 / 30))
+            yield {'id': number, 'review_id': review_id,
+                   'author_id': rng.randint(1, user_count),
+                   'text': rng.choice(pool), 'pub_date': moment}
+
+
+def bulk_insert(model, rows, batch_size, using=DEFAULT_DB_ALIAS):
+    """Вставляет строки через executemany, минуя создание объектов моделей.
+
+    Столбцы берутся по ключам первой строки, остальным полям модели
+    достаются значения по умолчанию. Даты приводятся напрямую функцией
+    бэкенда: полная подготовка значения поля занимала больше времени,
+    чем сама вставка. Возвращает количество строк.
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return 0
+    connection = connections[using]
+    # используется защищенный атрибут _meta
+    fields = [
+        field for field in model._meta.concrete_fields
+        if field.attname in first or not field.primary_key
+    ]
+    defaults = {
+        field.attname: field.get_db_prep_save(
+            field.get_default(), connection
+        )
+        for field in fields if field.attname not in first
+    }
+    adapt_datetime = connection.ops.adapt_datetimefield_value
+    prepare = [
+        (field.attname,
+         adapt_datetime if isinstance(field, models.DateTimeField) else None)
+        for field in fields
+    ]
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+
+    def values(row):
+        return [
+            defaults[attname] if attname not in row
+            else adapt(row[attname]) if adapt
+            else row[attname]
+            for attname, adapt in prepare
+        ]
+
+    total = 0
+    rows = chain([first], rows)
+    with connection.cursor() as cursor:
+        while True:
+            batch = [values(row) for row in islice(rows, batch_size)]
+            if not batch:
+                return total
+            cursor.executemany(sql, batch)
+            total += len(batch)
+
+
+def generate_dataset(scale, seed=0, exponent=1.0, burst=4.0,
+                     batch_size=DEFAULT_BATCH_SIZE):
+    """Создаёт синтетические данные размера scale в пустой базе.
+
+    scale - словарь с количествами users, categories, genres, titles,
+    reviews и comments. У каждой таблицы свой генератор случайных чисел
+    от seed, так что изменение размера одной таблицы не меняет другие.
+    Возвращает итератор пар (модель, количество строк), таблица
+    создаётся при получении следующего элемента.
+    """
+    counts = {}
+    tables = (
+        (User, lambda rng: users(rng, scale['users'])),
+        (Category, lambda rng: categories(rng, scale['categories'])),
+        (Genre, lambda rng: genres(rng, scale['genres'])),
+        (Title, lambda rng: titles(
+            rng, scale['titles'], scale['categories'])),
+        (GenreTitle, lambda rng: genre_titles(
+            rng, scale['titles'], scale['genres'])),
+        (Review, lambda rng: reviews(
+            rng, scale['reviews'], scale['titles'], scale['users'],
+            exponent)),
+        # Отзывов может получиться меньше: у произведения их не больше,
+        # чем пользователей
+        (Comment, lambda rng: comments(
+            rng, scale['comments'] if counts[Review] else 0,
+            counts[Review], scale['users'], burst)),
+    )
+    for model, rows in tables:
+        rng = random.Random(f'{seed}:{model._meta.label}')
+        with transaction.atomic():
+            counts[model] = bulk_insert(model, rows(rng), batch_size)
+        bulk_written.send(sender=model)
+        yield model, counts[model]
@@ -0,0 +1,47 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from reviews.csv_export import (CSV_COLUMNS, EXPORT_FORMATS, export_file,
+                                snapshot)
+
+
+class Command(BaseCommand):
+    help = "Выгружает данные из базы данных в файлы CSV или NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='Каталог для выгружаемых файлов'
+        )
+        parser.add_argument(
+            '--format',
+            choices=EXPORT_FORMATS,
+            default='csv',
+            help='Формат файлов; CSV повторяет static/data, где нет '
+                 'описаний произведений, NDJSON содержит и их'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.EXPORT_CHUNK_SIZE,
+            help='Количество строк, читаемых из БД за раз'
+        )
+
+    def handle(self, *args, **options):
+        """Выгружает все файлы из одного снимка данных."""
+        path = Path(options['path'])
+        path.mkdir(parents=True, exist_ok=True)
+        export_format = options['format']
+        with snapshot():
+            for file_name in CSV_COLUMNS:
+                target = path / Path(file_name).with_suffix(
+                    f'.{export_format}'
+                )
+                with open(target, 'w', newline='', encoding='utf-8') as file:
+                    file.writelines(export_file(
+                        file_name, export_format, options['chunk_size']
+                    ))
+                self.stdout.write(f'{target}')
+        self.stdout.write(self.style.SUCCESS("Данные успешно выгружены!"))
@@ -0,0 +1,89 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from reviews.dataset import DEFAULT_BATCH_SIZE, generate_dataset
+from reviews.models import Title, User
+from reviews.search import rebuild_search_index
+from reviews.services import recalculate_title_ratings
+
+SCALE = {
+    'users': 10000,
+    'categories': 20,
+    'genres': 50,
+    'titles': 2000,
+    'reviews': 200000,
+    'comments': 500000,
+}
+
+
+class Command(BaseCommand):
+    help = "Заполняет пустую базу данных синтетическими данными"
+
+    def add_arguments(self, parser):
+        for name, default in SCALE.items():
+            parser.add_argument(
+                f'--{name}',
+                type=int,
+                default=default,
+                help=f'Количество строк ({default} по умолчанию)'
+            )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Одинаковый seed даёт одинаковые данные'
+        )
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=1.0,
+            help='Показатель распределения Ципфа отзывов по произведениям'
+        )
+        parser.add_argument(
+            '--burst',
+            type=float,
+            default=4.0,
+            help='Средняя длина ветки комментариев'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одном executemany'
+        )
+
+    def handle(self, *args, **options):
+        if User.objects.exists() or Title.objects.exists():
+            raise CommandError(
+                'База данных не пуста: выполните `manage.py flush`.'
+            )
+        scale = {name: options[name] for name in SCALE}
+        required = ('users', 'categories', 'genres', 'titles')
+        if any(scale[name] < 1 for name in required):
+            raise CommandError(
+                f'Значения {", ".join(required)} должны быть больше нуля.'
+            )
+        started = time.perf_counter()
+        table_started = started
+        for model, count in generate_dataset(
+            scale, options['seed'], options['zipf'], options['burst'],
+            options['batch_size']
+        ):
+            self.report(model._meta.model_name, count,
+                        table_started)
+            table_started = time.perf_counter()
+
+        recalculate_title_ratings()
+        rebuild_search_index()
+        self.report('счётчики и поиск', scale['titles'], table_started)
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные созданы за {time.perf_counter() - started:.1f} с'
+        ))
+
+    def report(self, name, count, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{name}: {count} строк за {elapsed:.2f} с '
+            f'({count / max(elapsed, 1e-9):.0f} строк/с)'
+        )
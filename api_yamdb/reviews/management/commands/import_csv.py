@@ -0,0 +1,77 @@
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from reviews.csv_import import DEFAULT_BATCH_SIZE, CsvImportError, import_csv
+from reviews.models import Title
+from reviews.search import index_titles
+from reviews.services import recalculate_title_ratings
+
+# Количество произведений в одном пересчёте: id передаются параметрами
+# запроса, а их число в SQLite ограничено
+TITLE_CHUNK_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = "Импортирует данные из файлов CSV в базу данных"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=settings.CSV_FILE_PATH,
+            help='Каталог с файлами CSV'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одном INSERT'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Количество процессов для разбора CSV (по умолчанию - '
+                 'по числу ядер, 1 - без дочерних процессов)'
+        )
+
+    def handle(self, *args, **options):
+        """Начинает импортировать и записывать данные в базу данных."""
+        total, started = Counter(), time.perf_counter()
+        stage_started, title_ids = started, set()
+        try:
+            for stage, stats, affected in import_csv(
+                options['path'], options['batch_size'], options['workers']
+            ):
+                stage_total = sum(stats.values(), Counter())
+                self.report(', '.join(stage), stage_total, stage_started)
+                total += stage_total
+                title_ids.update(affected)
+                stage_started = time.perf_counter()
+        except CsvImportError as error:
+            raise CommandError(f'Ошибка импорта: {error}')
+
+        self.refresh_titles(sorted(title_ids))
+        self.report('всего', total, started)
+        self.stdout.write(
+            self.style.SUCCESS("Данные CSV успешно импортированы!")
+        )
+
+    @staticmethod
+    def refresh_titles(title_ids):
+        """Пересчитывает рейтинг и индекс только затронутых произведений."""
+        for start in range(0, len(title_ids), TITLE_CHUNK_SIZE):
+            chunk = title_ids[start:start + TITLE_CHUNK_SIZE]
+            recalculate_title_ratings(Title.objects.filter(pk__in=chunk))
+            index_titles(chunk)
+
+    def report(self, name, stats, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{name}: {stats["read"]} строк за {elapsed:.2f} с '
+            f'({stats["read"] / max(elapsed, 1e-9):.0f} строк/с), '
+            f'без изменений {stats["skipped"]}, '
+            f'добавлено {stats["created"]}, обновлено {stats["updated"]}'
+        )
@@ -0,0 +1,18 @@
+from django.core.management import BaseCommand
+
+from reviews.search import rebuild_search_index, search_supported
+
+
+class Command(BaseCommand):
+    help = "Перестраивает полнотекстовый индекс произведений"
+
+    def handle(self, *args, **options):
+        if not search_supported():
+            self.stdout.write(self.style.WARNING(
+                "Полнотекстовый индекс поддерживается только для SQLite."
+            ))
+            return
+        count = rebuild_search_index()
+        self.stdout.write(
+            self.style.SUCCESS(f"Проиндексировано произведений: {count}")
+        )
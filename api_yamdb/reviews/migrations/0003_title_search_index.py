@@ -0,0 +1,40 @@
+from django.db import migrations, models
+import django.db.models.deletion
+import reviews.models
+
+
+def create_search_index(apps, schema_editor):
+    from reviews.search import create_search_index, rebuild_search_index
+    create_search_index(schema_editor.connection)
+    rebuild_search_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from reviews.search import SEARCH_TABLE
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_title_rating_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleSearch',
+            fields=[
+                ('title', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search', serialize=False, to='reviews.title')),
+                ('name', models.TextField()),
+                ('description', models.TextField()),
+                ('document', reviews.models.SearchDocumentField(db_column='reviews_title_search')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'reviews_title_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
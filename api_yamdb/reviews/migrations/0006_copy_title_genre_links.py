@@ -0,0 +1,71 @@
+"""Перевод Title.genre на промежуточную модель GenreTitle.
+
+Изначально Title.genre был обычным ManyToManyField, и связи, созданные
+через API, хранились в автоматической таблице reviews_title_genre.
+Теперь связь идёт через GenreTitle: в состоянии миграций у поля
+появляется through, а в базе недостающие связи копируются в
+reviews_genretitle. Старая таблица не удаляется.
+
+Схема базы, созданной до появления миграций, совпадает с 0001_initial:
+в такой базе 0001_initial отмечается применённой
+(MigrationRecorder(connection).record_applied('reviews', '0001_initial')),
+а остальные миграции, включая эту, применяются обычным migrate.
+"""
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+OLD_TABLE = 'reviews_title_genre'
+
+
+def copy_title_genre_links(apps, schema_editor):
+    connection = schema_editor.connection
+    if OLD_TABLE not in connection.introspection.table_names():
+        return
+    db = connection.alias
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    DataVersion = apps.get_model('reviews', 'DataVersion')
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT title_id, genre_id FROM {OLD_TABLE}')
+        links = set(cursor.fetchall())
+    links.difference_update(
+        GenreTitle.objects.using(db).values_list('title_id', 'genre_id')
+    )
+    if not links:
+        return
+    GenreTitle.objects.using(db).bulk_create([
+        GenreTitle(title_id=title_id, genre_id=genre_id)
+        for title_id, genre_id in sorted(links)
+    ], batch_size=1000)
+    # Жанры произведений изменились: кэш и ETag должны устареть
+    DataVersion.objects.using(db).filter(model='reviews.title').update(
+        version=F('version') + 1, modified=timezone.now()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_data_version'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='title',
+                    name='genre',
+                    field=models.ManyToManyField(help_text='Жанр, к которому относится произведение', related_name='titles', through='reviews.GenreTitle', to='reviews.Genre', verbose_name='Жанр'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(
+                    copy_title_genre_links, migrations.RunPython.noop
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='genretitle',
+            constraint=models.UniqueConstraint(fields=('title', 'genre'), name='unique_genre_title'),
+        ),
+    ]
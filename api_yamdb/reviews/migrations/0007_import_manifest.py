@@ -0,0 +1,29 @@
+# Generated by Django 3.2 on 2026-10-18 17:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_copy_title_genre_links'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportManifest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(max_length=255, unique=True, verbose_name='Файл')),
+                ('checksum', models.CharField(max_length=64, verbose_name='Контрольная сумма файла')),
+                ('batch_size', models.PositiveIntegerField(verbose_name='Размер пачки')),
+                ('chunks', models.JSONField(default=list, verbose_name='Хэши пачек')),
+                ('rows', models.PositiveIntegerField(default=0, verbose_name='Количество строк')),
+                ('imported_at', models.DateTimeField(auto_now=True, verbose_name='Дата импорта')),
+            ],
+            options={
+                'verbose_name': 'Манифест импорта',
+                'verbose_name_plural': 'Манифесты импорта',
+            },
+        ),
+    ]
@@ -6,6 +6,9 @@ from core.user_validation import check_name
 
 from .validators import validate_creation_year
 
+MIN_SCORE = 1
+MAX_SCORE = 10
+
 
 class User(AbstractUser):
     """Модель пользователя."""
@@ -121,10 +124,12 @@ class Title(models.Model):
         on_delete=models.SET_NULL,
         null=True,
         blank=True,
+        db_index=False,
         verbose_name="Категория",
         help_text="Категория, к которой относится произведение")
     genre = models.ManyToManyField(
         Genre,
+        through="GenreTitle",
         related_name="titles",
         verbose_name="Жанр",
         help_text="Жанр, к которому относится произведение"
@@ -134,15 +139,112 @@ class Title(models.Model):
         db_index=True,
         validators=[validate_creation_year]
     )
+    review_count = models.PositiveIntegerField(
+        "Количество отзывов",
+        default=0,
+        db_index=True,
+        editable=False
+    )
+    score_sum = models.PositiveIntegerField(
+        "Сумма оценок",
+        default=0,
+        editable=False
+    )
+    rating = models.FloatField(
+        "Рейтинг",
+        null=True,
+        db_index=True,
+        editable=False
+    )
+    score_1_count = models.PositiveIntegerField(default=0, editable=False)
+    score_2_count = models.PositiveIntegerField(default=0, editable=False)
+    score_3_count = models.PositiveIntegerField(default=0, editable=False)
+    score_4_count = models.PositiveIntegerField(default=0, editable=False)
+    score_5_count = models.PositiveIntegerField(default=0, editable=False)
+    score_6_count = models.PositiveIntegerField(default=0, editable=False)
+    score_7_count = models.PositiveIntegerField(default=0, editable=False)
+    score_8_count = models.PositiveIntegerField(default=0, editable=False)
+    score_9_count = models.PositiveIntegerField(default=0, editable=False)
+    score_10_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('name',)
+        indexes = [
+            models.Index(
+                fields=['category', '-rating'],
+                name='title_category_rating_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name[:settings.CHARS_LENGTH]
 
+    @staticmethod
+    def score_field(score):
+        """Имя поля-счётчика отзывов с указанной оценкой."""
+        return f'score_{score}_count'
+
+    @property
+    def score_distribution(self):
+        """Количество отзывов по каждой оценке."""
+        return {
+            score: getattr(self, self.score_field(score))
+            for score in range(MIN_SCORE, MAX_SCORE + 1)
+        }
+
+    @property
+    def median_score(self):
+        """Медиана оценок, вычисленная по гистограмме."""
+        if not self.review_count:
+            return None
+        middle = ((self.review_count - 1) // 2, self.review_count // 2)
+        values, seen = [], 0
+        for score, count in self.score_distribution.items():
+            values.extend(
+                score for position in middle
+                if seen <= position < seen + count
+            )
+            seen += count
+        return sum(values) / len(values)
+
+
+class SearchDocumentField(models.TextField):
+    """Скрытый столбец FTS5, совпадающий по имени с таблицей."""
+
+
+@SearchDocumentField.register_lookup
+class Match(models.Lookup):
+    """Полнотекстовый поиск FTS5: `column MATCH query`."""
+
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class TitleSearch(models.Model):
+    """Полнотекстовый индекс произведений (виртуальная таблица FTS5)."""
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search'
+    )
+    name = models.TextField()
+    description = models.TextField()
+    document = SearchDocumentField(db_column='reviews_title_search')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'reviews_title_search'
+
 
 class GenreTitle(models.Model):
     """Модель жанров и произведений."""
@@ -155,15 +257,23 @@ class GenreTitle(models.Model):
     genre = models.ForeignKey(
         Genre,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name="Жанр",
     )
 
-    def __str__(self):
-        return f"{self.title}, жанр - {self.genre}"
-
     class Meta:
         verbose_name = "Произведение и жанр"
         verbose_name_plural = "Произведения и жанры"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["title", "genre"], name="unique_genre_title"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["genre", "-title"], name="genre_title_title_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title}, жанр - {self.genre}"
@@ -173,13 +283,14 @@ class Review(models.Model):
     """Модель отзывов."""
 
     title = models.ForeignKey(
-        Title, on_delete=models.CASCADE, related_name='reviews')
+        Title, on_delete=models.CASCADE, related_name='reviews',
+        db_index=False)
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='reviews')
     text = models.TextField()
     score = models.SmallIntegerField(
-        validators=(MinValueValidator(1),
-                    MaxValueValidator(10)),
+        validators=(MinValueValidator(MIN_SCORE),
+                    MaxValueValidator(MAX_SCORE)),
         error_messages={'validators': 'Оценка должна быть от 1 до 10'}
     )
     pub_date = models.DateTimeField(
@@ -189,9 +300,15 @@ class Review(models.Model):
         ordering = ('-pub_date',)
         constraints = [
             models.UniqueConstraint(
-                fields=["author", "title"], name="unique_review"
+                fields=["title", "author"], name="unique_review"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["title", "-pub_date", "-id"],
+                name="review_title_pub_date_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.text[:settings.CHARS_LENGTH]
@@ -203,13 +320,60 @@ class Comment(models.Model):
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='comments')
     review = models.ForeignKey(
-        Review, on_delete=models.CASCADE, related_name='comments')
+        Review, on_delete=models.CASCADE, related_name='comments',
+        db_index=False)
     text = models.TextField()
     pub_date = models.DateTimeField(
         'Дата добавления', auto_now_add=True, db_index=True)
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=["review", "-pub_date", "-id"],
+                name="comment_review_pub_date_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.text
+
+
+class ImportManifest(models.Model):
+    """Контрольные суммы последнего импорта файла CSV.
+
+    chunks - хэши последовательных пачек по batch_size строк.
+    """
+
+    file_name = models.CharField('Файл', max_length=255, unique=True)
+    checksum = models.CharField('Контрольная сумма файла', max_length=64)
+    batch_size = models.PositiveIntegerField('Размер пачки')
+    chunks = models.JSONField('Хэши пачек', default=list)
+    rows = models.PositiveIntegerField('Количество строк', default=0)
+    imported_at = models.DateTimeField('Дата импорта', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Манифест импорта'
+        verbose_name_plural = 'Манифесты импорта'
+
+    def __str__(self):
+        return self.file_name
+
+
+class DataVersion(models.Model):
+    """Версия данных модели, по которой сбрасываются кэши API.
+
+    Хранится в БД, а не в кэше процесса, чтобы запись в одном процессе
+    видели все остальные.
+    """
+
+    model = models.CharField('Модель', max_length=100, unique=True)
+    version = models.BigIntegerField('Версия')
+    modified = models.DateTimeField('Дата изменения')
+
+    class Meta:
+        verbose_name = 'Версия данных'
+        verbose_name_plural = 'Версии данных'
+
+    def __str__(self):
+        return f'{self.model}: {self.version}'
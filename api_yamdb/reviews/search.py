@@ -0,0 +1,111 @@
+import re
+
+from django.db import connection
+from django.db.models import F, Q
+
+from .models import Title, TitleSearch
+
+SEARCH_TABLE = TitleSearch._meta.db_table
+
+
+def search_supported():
+    """Полнотекстовый индекс FTS5 есть только у SQLite."""
+    return connection.vendor == 'sqlite'
+
+
+def create_search_index(using=connection):
+    """Создаёт таблицу полнотекстового индекса произведений."""
+    if using.vendor != 'sqlite':
+        return
+    with using.cursor() as cursor:
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} '
+            'USING fts5(name, description, '
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+
+
+def index_title(title):
+    """Добавляет или обновляет произведение в индексе."""
+    if not search_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [title.pk]
+        )
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, name, description) '
+            'VALUES (%s, %s, %s)',
+            [title.pk, title.name, title.description or '']
+        )
+
+
+def unindex_title(title_id):
+    """Удаляет произведение из индекса."""
+    if not search_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [title_id]
+        )
+
+
+def rebuild_search_index(using=connection):
+    """Заново строит индекс по всем произведениям."""
+    if using.vendor != 'sqlite':
+        return 0
+    create_search_index(using)
+    with using.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, name, description) '
+            "SELECT id, name, COALESCE(description, '') "
+            f'FROM {Title._meta.db_table}'
+        )
+        return cursor.rowcount
+
+
+def index_titles(title_ids, using=connection):
+    """Перестраивает индекс для произведений с id из title_ids.
+
+    Произведения, которых уже нет в базе, из индекса удаляются.
+    """
+    if using.vendor != 'sqlite' or not title_ids:
+        return
+    title_ids = list(title_ids)
+    placeholders = ', '.join(['%s'] * len(title_ids))
+    with using.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})',
+            title_ids
+        )
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, name, description) '
+            "SELECT id, name, COALESCE(description, '') "
+            f'FROM {Title._meta.db_table} WHERE id IN ({placeholders})',
+            title_ids
+        )
+
+
+def build_match_query(text):
+    """Превращает поисковую строку в запрос FTS5 с поиском по префиксам."""
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_titles(queryset, text):
+    """Фильтрует произведения по запросу с сортировкой по релевантности."""
+    match = build_match_query(text)
+    if match is None:
+        return queryset
+    if not search_supported():
+        return queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text)
+        )
+    return (
+        queryset.filter(search__document__match=match)
+        .annotate(search_rank=F('search__rank'))
+        .order_by('search_rank', '-id')
+    )
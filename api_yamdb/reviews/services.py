@@ -0,0 +1,199 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Value, Window
+from django.db.models.functions import Cast, NullIf, RowNumber
+
+from .models import MAX_SCORE, MIN_SCORE, Comment, Review, Title
+from .signals import bulk_written
+
+
+def update_title_rating(title_id, score_deltas):
+    """Сдвигает счётчики отзывов произведения.
+
+    score_deltas - словарь {оценка: изменение количества отзывов}.
+    Возвращает количество обновлённых произведений (0 - если его нет).
+    """
+    changes = {
+        Title.score_field(score): F(Title.score_field(score)) + delta
+        for score, delta in score_deltas.items() if delta
+    }
+    if not changes:
+        return 0
+    review_count = F('review_count') + sum(score_deltas.values())
+    score_sum = F('score_sum') + sum(
+        score * delta for score, delta in score_deltas.items()
+    )
+    return Title.objects.filter(pk=title_id).update(
+        review_count=review_count,
+        score_sum=score_sum,
+        rating=(
+            Cast(score_sum, FloatField()) / NullIf(review_count, Value(0))
+        ),
+        **changes,
+    )
+
+
+def create_review(serializer, title_id, **kwargs):
+    """Сохраняет новый отзыв и учитывает его оценку в рейтинге.
+
+    Существование произведения проверяется самим UPDATE счётчиков, а
+    повторный отзыв - ограничением unique_review при вставке, поэтому
+    отдельных SELECT перед записью нет.
+    Выбрасывает Title.DoesNotExist, если произведения нет, и
+    IntegrityError, если отзыв автора на произведение уже существует.
+    """
+    score = serializer.validated_data['score']
+    with transaction.atomic():
+        if not update_title_rating(title_id, {score: 1}):
+            raise Title.DoesNotExist
+        return serializer.save(title_id=title_id, **kwargs)
+
+
+def update_review(serializer, **kwargs):
+    """Сохраняет изменения отзыва и переносит его оценку в счётчиках."""
+    with transaction.atomic():
+        old_score = (
+            Review.objects.select_for_update()
+            .values_list('score', flat=True)
+            .get(pk=serializer.instance.pk)
+        )
+        review = serializer.save(**kwargs)
+        if review.score != old_score:
+            update_title_rating(
+                review.title_id, {old_score: -1, review.score: 1}
+            )
+    return review
+
+
+def delete_review(review):
+    """Удаляет отзыв и исключает его оценку из рейтинга.
+
+    Оценка читается с блокировкой строки и вычитается, только если отзыв
+    действительно удалён: повторное или параллельное удаление того же
+    отзыва счётчики не меняет.
+    """
+    with transaction.atomic():
+        score = (
+            Review.objects.select_for_update().filter(pk=review.pk)
+            .values_list('score', flat=True).first()
+        )
+        if score is None:
+            return
+        _, deleted = review.delete()
+        if deleted.get(Review._meta.label):
+            update_title_rating(review.title_id, {score: -1})
+
+
+def exclude_reviews(reviews):
+    """Исключает оценки отзывов из счётчиков их произведений.
+
+    Вызывается в транзакции удаления отзывов, до него. Строки отзывов
+    блокируются до конца транзакции, чтобы параллельное удаление тех же
+    отзывов не вычло их оценки второй раз.
+    """
+    histograms = {}
+    for title_id, score in reviews.select_for_update().values_list(
+            'title_id', 'score'):
+        histograms.setdefault(title_id, Counter())[score] -= 1
+    for title_id, histogram in histograms.items():
+        update_title_rating(title_id, histogram)
+
+
+def bulk_delete_reviews(queryset, chunk_size):
+    """Удаляет отзывы пачками, каждая - в своей транзакции.
+
+    Отзывы упорядочены по произведению, поэтому счётчики каждого
+    произведения обычно обновляются одним UPDATE на всю операцию.
+    Возвращает количество удалённых отзывов.
+    """
+    ids = list(
+        queryset.order_by('title_id', 'id').values_list('id', flat=True)
+    )
+    for start in range(0, len(ids), chunk_size):
+        chunk = Review.objects.filter(id__in=ids[start:start + chunk_size])
+        with transaction.atomic():
+            exclude_reviews(chunk)
+            chunk.delete()
+    return len(ids)
+
+
+def bulk_delete_comments(queryset, chunk_size):
+    """Удаляет комментарии пачками, каждая - в своей транзакции."""
+    ids = list(queryset.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(ids), chunk_size):
+        with transaction.atomic():
+            Comment.objects.filter(
+                id__in=ids[start:start + chunk_size]
+            ).delete()
+    return len(ids)
+
+
+def score_histograms(reviews):
+    """Гистограммы оценок {id произведения: Counter(оценка: отзывов)}."""
+    histograms = {}
+    for row in (reviews.order_by().values('title_id', 'score')
+                .annotate(count=Count('id'))):
+        histograms.setdefault(row['title_id'], Counter())[row['score']] = (
+            row['count']
+        )
+    return histograms
+
+
+def rating_counters(histogram):
+    """Значения счётчиков произведения по гистограмме оценок."""
+    review_count = sum(histogram.values())
+    score_sum = sum(score * count for score, count in histogram.items())
+    return {
+        'review_count': review_count,
+        'score_sum': score_sum,
+        'rating': score_sum / review_count if review_count else None,
+        **{
+            Title.score_field(score): histogram[score]
+            for score in range(MIN_SCORE, MAX_SCORE + 1)
+        },
+    }
+
+
+def recalculate_title_ratings(titles=None):
+    """Пересчитывает счётчики отзывов по данным таблицы отзывов."""
+    titles = Title.objects.all() if titles is None else titles
+    histograms = score_histograms(Review.objects.filter(title__in=titles))
+    with transaction.atomic():
+        for title in titles.only('id'):
+            Title.objects.filter(pk=title.id).update(**rating_counters(
+                histograms.get(title.id, Counter())
+            ))
+    bulk_written.send(sender=Title)
+
+
+def comment_previews(review_ids, size):
+    """Количество комментариев и `size` новейших из них для каждого отзыва.
+
+    Выбирается одним запросом с ROW_NUMBER() по review_id.
+    Возвращает словарь {review_id: (количество, [комментарии])}.
+    """
+    partition = {'partition_by': [F('review_id')]}
+    ranked = Comment.objects.filter(review_id__in=review_ids).annotate(
+        author_username=F('author__username'),
+        preview_rank=Window(
+            RowNumber(),
+            order_by=[F('pub_date').desc(), F('id').desc()],
+            **partition
+        ),
+        comment_total=Window(Count('id'), **partition),
+    ).order_by()
+    sql, params = ranked.query.sql_with_params()
+    comments = Comment.objects.raw(
+        f'SELECT * FROM ({sql}) ranked WHERE preview_rank <= %s '
+        'ORDER BY review_id, preview_rank',
+        (*params, max(size, 1))
+    )
+    previews = {}
+    for comment in comments:
+        total, preview = previews.setdefault(
+            comment.review_id, (comment.comment_total, [])
+        )
+        if comment.preview_rank <= size:
+            preview.append(comment)
+    return previews
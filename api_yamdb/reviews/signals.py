@@ -0,0 +1,32 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+
+from .models import Title, User
+from .search import index_title, unindex_title
+
+# Отправляется после массовой записи в обход save()/delete(), sender - модель
+bulk_written = Signal()
+
+
+@receiver(post_save, sender=Title)
+def update_search_index(sender, instance, **kwargs):
+    """Синхронизирует поисковый индекс при сохранении произведения."""
+    index_title(instance)
+
+
+@receiver(post_delete, sender=Title)
+def remove_from_search_index(sender, instance, **kwargs):
+    """Удаляет произведение из поискового индекса."""
+    unindex_title(instance.pk)
+
+
+@receiver(pre_delete, sender=User)
+def exclude_author_reviews(sender, instance, **kwargs):
+    """Исключает из рейтингов отзывы удаляемого пользователя.
+
+    Отзывы удаляются каскадом, минуя delete_review(), поэтому счётчики
+    произведений правятся здесь, в той же транзакции.
+    """
+    # services импортирует этот модуль ради bulk_written
+    from .services import exclude_reviews
+    exclude_reviews(instance.reviews.all())
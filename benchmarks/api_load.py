@@ -0,0 +1,380 @@
+"""Нагрузочный прогон API: задержки, пропускная способность и запросы к БД.
+
+Создаёт временную базу SQLite и заполняет её командой generate_dataset
+(или берёт готовую через --database). Затем по очереди нагружает
+эндпоинты из api/urls.py. Для каждого эндпоинта --concurrency потоков
+выполняют --requests запросов через django.test.Client: проходят
+маршрутизация, middleware и DRF, но без сети и HTTP-сервера.
+
+    python benchmarks/api_load.py --output before.json
+    python benchmarks/api_load.py --output after.json --compare before.json
+"""
+import argparse
+import io
+import itertools
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT_DIR), str(ROOT_DIR / 'api_yamdb')]
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+API = '/api/v1'
+SAMPLE_SIZE = 1000
+RSS_INTERVAL = 0.01
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database',
+                        help='Файл SQLite; пустой заполняется данными')
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--titles', type=int, default=2000)
+    parser.add_argument('--reviews', type=int, default=100000)
+    parser.add_argument('--comments', type=int, default=200000)
+    parser.add_argument('--requests', type=int, default=500,
+                        help='Запросов на эндпоинт')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--only', action='append', default=[],
+                        help='Подстрока названия эндпоинта')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Файл JSON с результатами')
+    parser.add_argument('--compare', help='JSON прошлого прогона')
+    return parser.parse_args()
+
+
+def setup_django(db_path):
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DATABASES['default']['OPTIONS'] = {'timeout': 30}
+    # Как в продакшене: без журнала SQL и писем в консоль
+    settings.DEBUG = False
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+    import django
+    django.setup()
+
+
+def prepare_database(args):
+    from django.core.management import call_command
+
+    from reviews.models import User
+
+    call_command('migrate', verbosity=0)
+    if not User.objects.exists():
+        started = time.perf_counter()
+        call_command(
+            'generate_dataset', users=args.users, titles=args.titles,
+            reviews=args.reviews, comments=args.comments, seed=args.seed,
+            stdout=io.StringIO()
+        )
+        print(f'Данные созданы за {time.perf_counter() - started:.1f} с')
+
+
+class State:
+    """Выборки существующих объектов и пользователи для запросов.
+
+    Произведения и отзывы берутся из случайных отзывов и комментариев,
+    поэтому популярные объекты запрашиваются чаще, как в реальном трафике.
+    """
+
+    def __init__(self, args, rng):
+        from api.utils import get_token_for_user, make_token
+        from reviews.models import Category, Comment, Genre, Review, User
+
+        self.rng = rng
+        self.titles = list(Review.objects.order_by('?').values_list(
+            'title_id', flat=True)[:SAMPLE_SIZE])
+        self.reviews = list(Comment.objects.order_by('?').values_list(
+            'review__title_id', 'review_id')[:SAMPLE_SIZE])
+        self.categories = list(Category.objects.values_list('slug', flat=True))
+        self.genres = list(Genre.objects.values_list('slug', flat=True))
+        self.usernames = list(User.objects.order_by('?').values_list(
+            'username', flat=True)[:SAMPLE_SIZE])
+        self.all_titles = list(
+            Review.objects.order_by().values_list('title_id', flat=True)
+            .distinct()
+        )
+
+        run = int(time.time())
+        admin = User.objects.create(
+            username=f'bench_admin_{run}', email=f'admin_{run}@bench.fake',
+            role=User.ADMIN
+        )
+        self.admin_token = get_token_for_user(admin)
+        self.authors = []
+        for index in range(args.concurrency):
+            author = User.objects.create(
+                username=f'bench_{run}_{index}',
+                email=f'bench_{run}_{index}@bench.fake'
+            )
+            self.authors.append(get_token_for_user(author))
+        self.codes = [
+            (user.username, make_token(user))
+            for user in User.objects.filter(
+                username__in=self.usernames[:100]
+            )
+        ]
+        self.run = run
+
+
+def review_title(state, worker):
+    # У каждого потока свой автор, произведения он перебирает по порядку,
+    # поэтому пара (автор, произведение) не повторяется
+    return state.all_titles[next(worker.sequence) % len(state.all_titles)]
+
+
+def signup_data(state, worker):
+    username = f'signup_{state.run}_{worker.index}_{next(worker.sequence)}'
+    return {'username': username, 'email': f'{username}@bench.fake'}
+
+
+# (название, роль клиента, фабрика (метод, путь, тело))
+ENDPOINTS = (
+    ('GET titles', 'anon', lambda state, worker: (
+        'GET', f'{API}/titles/', None)),
+    ('GET titles?genre&category', 'anon', lambda state, worker: (
+        'GET', f'{API}/titles/?genre={state.rng.choice(state.genres)}'
+               f'&category={state.rng.choice(state.categories)}', None)),
+    ('GET titles?year', 'anon', lambda state, worker: (
+        'GET', f'{API}/titles/?year={state.rng.randint(1950, 2020)}', None)),
+    ('GET titles/{id}', 'anon', lambda state, worker: (
+        'GET', f'{API}/titles/{state.rng.choice(state.titles)}/', None)),
+    ('GET reviews', 'anon', lambda state, worker: (
+        'GET', f'{API}/titles/{state.rng.choice(state.titles)}/reviews/',
+        None)),
+    ('POST reviews', 'author', lambda state, worker: (
+        'POST', f'{API}/titles/{review_title(state, worker)}/reviews/',
+        {'text': 'Отзыв из нагрузочного теста',
+         'score': state.rng.randint(1, 10)})),
+    ('GET comments', 'anon', lambda state, worker: (
+        'GET', '{}/titles/{}/reviews/{}/comments/'.format(
+            API, *state.rng.choice(state.reviews)), None)),
+    ('POST comments', 'author', lambda state, worker: (
+        'POST', '{}/titles/{}/reviews/{}/comments/'.format(
+            API, *state.rng.choice(state.reviews)),
+        {'text': 'Комментарий из нагрузочного теста'})),
+    ('POST auth/signup', 'anon', lambda state, worker: (
+        'POST', f'{API}/auth/signup/', signup_data(state, worker))),
+    ('POST auth/token', 'anon', lambda state, worker: (
+        'POST', f'{API}/auth/token/', dict(zip(
+            ('username', 'confirmation_code'),
+            state.rng.choice(state.codes))))),
+    ('GET users', 'admin', lambda state, worker: (
+        'GET', f'{API}/users/', None)),
+    ('GET users?search', 'admin', lambda state, worker: (
+        'GET', f'{API}/users/?search=user{state.rng.randint(1, 99)}', None)),
+    ('GET users/{username}', 'admin', lambda state, worker: (
+        'GET', f'{API}/users/{state.rng.choice(state.usernames)}/', None)),
+)
+
+
+class Worker:
+    """Клиент одного потока: свой Client, автор и счётчик."""
+
+    def __init__(self, index, state):
+        from django.test import Client
+
+        self.index = index
+        self.client = Client()
+        self.sequence = itertools.count()
+        self.headers = {
+            'anon': {},
+            'author': {
+                'HTTP_AUTHORIZATION': f'Bearer {state.authors[index]}'
+            },
+            'admin': {'HTTP_AUTHORIZATION': f'Bearer {state.admin_token}'},
+        }
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class RssSampler(threading.Thread):
+    """Пиковый RSS процесса за время работы, по /proc/self/status."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.peak = current_rss()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(RSS_INTERVAL):
+            self.peak = max(self.peak, current_rss())
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        return max(self.peak, current_rss())
+
+
+def current_rss():
+    """RSS в КиБ; без /proc - пиковый RSS процесса за всё время."""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_endpoint(state, workers, role, factory, total):
+    """Выполняет total запросов всеми потоками.
+
+    Возвращает списки задержек (мс), числа SQL-запросов и статусов.
+    """
+    from django.db import connection
+
+    tickets = iter(range(total))
+    lock = threading.Lock()
+    samples = []
+
+    def work(worker):
+        result = []
+        while True:
+            with lock:
+                if next(tickets, None) is None:
+                    break
+                method, path, data = factory(state, worker)
+            counter = QueryCounter()
+            started = time.perf_counter()
+            with connection.execute_wrapper(counter):
+                response = worker.client.generic(
+                    method, path,
+                    json.dumps(data) if data is not None else '',
+                    content_type='application/json',
+                    **worker.headers[role]
+                )
+            result.append((
+                (time.perf_counter() - started) * 1000,
+                counter.count, response.status_code
+            ))
+        connection.close()
+        with lock:
+            samples.extend(result)
+
+    with ThreadPoolExecutor(len(workers)) as executor:
+        list(executor.map(work, workers))
+    return samples
+
+
+def summarize(samples, elapsed, peak_rss):
+    latencies = sorted(sample[0] for sample in samples)
+    percentiles = statistics.quantiles(latencies, n=100, method='inclusive')
+    statuses = {}
+    for _, _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        'requests': len(samples),
+        'throughput': len(samples) / elapsed,
+        'p50': percentiles[49],
+        'p95': percentiles[94],
+        'p99': percentiles[98],
+        'max': latencies[-1],
+        'queries': statistics.mean(sample[1] for sample in samples),
+        'peak_rss_kib': peak_rss,
+        'statuses': statuses,
+    }
+
+
+def measure(args, state):
+    workers = [Worker(index, state) for index in range(args.concurrency)]
+    results = {}
+    for name, role, factory in ENDPOINTS:
+        if args.only and not any(part in name for part in args.only):
+            continue
+        run_endpoint(state, workers, role, factory, args.warmup)
+        sampler = RssSampler()
+        sampler.start()
+        started = time.perf_counter()
+        samples = run_endpoint(state, workers, role, factory, args.requests)
+        elapsed = time.perf_counter() - started
+        results[name] = summarize(samples, elapsed, sampler.stop())
+        report_line(name, results[name])
+    return results
+
+
+def report_header():
+    print(f'\n{"эндпоинт":<28} {"зап/с":>8} {"p50":>8} {"p95":>8} '
+          f'{"p99":>8} {"SQL":>6} {"RSS МиБ":>8}  статусы')
+
+
+def report_line(name, result):
+    print(f'{name:<28} {result["throughput"]:8.1f} {result["p50"]:8.2f} '
+          f'{result["p95"]:8.2f} {result["p99"]:8.2f} '
+          f'{result["queries"]:6.1f} {result["peak_rss_kib"] / 1024:8.1f}  '
+          f'{result["statuses"]}')
+
+
+def compare(results, path):
+    with open(path, encoding='utf-8') as file:
+        previous = json.load(file)
+    print(f'\n=== сравнение с {previous.get("commit") or path} ===')
+    print(f'{"эндпоинт":<28} {"зап/с":>8} {"p50":>8} {"p95":>8} '
+          f'{"p99":>8} {"SQL":>8}')
+    for name, result in results.items():
+        old = previous['endpoints'].get(name)
+        if old is None:
+            continue
+        print(f'{name:<28} '
+              f'x{result["throughput"] / old["throughput"]:7.2f} '
+              + ' '.join(
+                  f'x{result[key] / old[key]:7.2f}' if old[key] else
+                  f'{"-":>8}' for key in ('p50', 'p95', 'p99', 'queries')
+              ))
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        setup_django(
+            args.database or os.path.join(tmp_dir, 'bench.sqlite3')
+        )
+        prepare_database(args)
+        state = State(args, random.Random(args.seed))
+        report_header()
+        results = measure(args, state)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({
+                'commit': current_commit(),
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'args': vars(args),
+                'endpoints': results,
+            }, file, ensure_ascii=False, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""Планы и время горячих запросов до и после составных индексов.
+
+Создаёт временную базу SQLite, применяет миграции reviews до
+0003_title_search_index (без составных индексов), заполняет её
+синтетическими данными, замеряет запросы, затем применяет
+0004_composite_indexes и повторяет замеры.
+
+    python benchmarks/index_plans.py --titles 20000 --reviews 300000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT_DIR), str(ROOT_DIR / 'api_yamdb')]
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+BEFORE = '0003_title_search_index'
+AFTER = '0004_composite_indexes'
+BATCH_SIZE = 5000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--titles', type=int, default=20000)
+    parser.add_argument('--categories', type=int, default=20)
+    parser.add_argument('--genres', type=int, default=50)
+    parser.add_argument('--reviews', type=int, default=200000)
+    parser.add_argument('--comments', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    return parser.parse_args()
+
+
+def setup_django(db_path):
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+    import django
+    django.setup()
+
+
+def bulk_insert(model, rows):
+    model.objects.bulk_create(
+        (model(**row) for row in rows), batch_size=BATCH_SIZE
+    )
+
+
+def populate(args, rng):
+    from django.db import transaction
+    from django.utils import timezone
+
+    from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                                Title, User)
+
+    now = timezone.now()
+    with transaction.atomic():
+        bulk_insert(User, (
+            {'id': i, 'username': f'user{i}', 'email': f'user{i}@yamdb.fake'}
+            for i in range(1, args.users + 1)
+        ))
+        bulk_insert(Category, (
+            {'id': i, 'name': f'Категория {i}', 'slug': f'category-{i}'}
+            for i in range(1, args.categories + 1)
+        ))
+        bulk_insert(Genre, (
+            {'id': i, 'name': f'Жанр {i}', 'slug': f'genre-{i}'}
+            for i in range(1, args.genres + 1)
+        ))
+        bulk_insert(Title, (
+            {'id': i, 'name': f'Произведение {i}', 'year': 1900 + i % 120,
+             'category_id': rng.randint(1, args.categories)}
+            for i in range(1, args.titles + 1)
+        ))
+        bulk_insert(GenreTitle, (
+            {'title_id': title_id, 'genre_id': genre_id}
+            for title_id in range(1, args.titles + 1)
+            for genre_id in rng.sample(range(1, args.genres + 1), 2)
+        ))
+        pairs = set()
+        while len(pairs) < args.reviews:
+            pairs.add((rng.randint(1, args.titles),
+                       rng.randint(1, args.users)))
+        bulk_insert(Review, (
+            {'id': i, 'title_id': title_id, 'author_id': author_id,
+             'text': 'Отзыв', 'score': rng.randint(1, 10),
+             'pub_date': now - timezone.timedelta(seconds=i)}
+            for i, (title_id, author_id) in enumerate(pairs, 1)
+        ))
+        bulk_insert(Comment, (
+            {'id': i, 'review_id': rng.randint(1, args.reviews),
+             'author_id': rng.randint(1, args.users), 'text': 'Комментарий',
+             'pub_date': now - timezone.timedelta(seconds=i)}
+            for i in range(1, args.comments + 1)
+        ))
+    return pairs
+
+
+def hot_queries(args, rng, pairs):
+    """Запросы основных эндпоинтов: (название, фабрика QuerySet)."""
+    from reviews.models import Comment, Review, Title
+
+    pairs = list(pairs)
+    return [
+        ('reviews of title', lambda: list(
+            Review.objects.filter(title_id=rng.randint(1, args.titles))
+            .order_by('-pub_date', '-id')[:5]
+        )),
+        ('comments of review', lambda: list(
+            Comment.objects.filter(review_id=rng.randint(1, args.reviews))
+            .order_by('-pub_date', '-id')[:5]
+        )),
+        ('titles by category', lambda: list(
+            Title.objects.filter(
+                category_id=rng.randint(1, args.categories)
+            ).order_by('-id')[:5]
+        )),
+        ('top titles in category', lambda: list(
+            Title.objects.filter(
+                category_id=rng.randint(1, args.categories)
+            ).order_by('-rating')[:5]
+        )),
+        ('titles by genre', lambda: list(
+            Title.objects.filter(genre__id=rng.randint(1, args.genres))
+            .order_by('-id')[:5]
+        )),
+        ('review by title and author', lambda: list(
+            Review.objects.filter(
+                title_id=rng.choice(pairs)[0],
+                author_id=rng.choice(pairs)[1]
+            )
+        )),
+    ]
+
+
+def explain(queryset_factory):
+    from django.db import connection
+
+    with connection.execute_wrapper(capture_sql):
+        queryset_factory()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {capture_sql.sql}',
+                       capture_sql.params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def capture_sql(execute, sql, params, many, context):
+    capture_sql.sql, capture_sql.params = sql, params
+    return execute(sql, params, many, context)
+
+
+def measure(args, queries):
+    results = {}
+    for name, query in queries:
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            query()
+            timings.append((time.perf_counter() - started) * 1000)
+        results[name] = (statistics.median(timings), explain(query))
+    return results
+
+
+def report(stage, results):
+    print(f'\n=== {stage} ===')
+    for name, (median, plan) in results.items():
+        print(f'{name:<28} {median:8.3f} ms')
+        for line in plan:
+            print(f'    {line}')
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        setup_django(os.path.join(tmp_dir, 'bench.sqlite3'))
+        from django.core.management import call_command
+
+        call_command('migrate', 'reviews', BEFORE, verbosity=0)
+        rng = random.Random(args.seed)
+        started = time.perf_counter()
+        pairs = populate(args, rng)
+        print(f'Данные созданы за {time.perf_counter() - started:.1f} с')
+        queries = hot_queries(args, rng, pairs)
+
+        before = measure(args, queries)
+        report(f'до индексов ({BEFORE})', before)
+        call_command('migrate', 'reviews', AFTER, verbosity=0)
+        after = measure(args, queries)
+        report(f'после индексов ({AFTER})', after)
+
+        print('\n=== ускорение ===')
+        for name in before:
+            print(f'{name:<28} x{before[name][0] / after[name][0]:.1f}')
+
+
+if __name__ == '__main__':
+    main()
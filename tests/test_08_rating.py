@@ -0,0 +1,146 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def test_01_rating_follows_review_changes(self, admin_client, user_client,
+                                              moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/'
+
+        review = create_single_review(admin_client, title_id, 'Отлично', 10)
+        create_single_review(user_client, title_id, 'Неплохо', 7)
+        create_single_review(moderator_client, title_id, 'Так себе', 4)
+        assert admin_client.get(url).json().get('rating') == 7, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает среднюю оценку '
+            'отзывов в поле `rating`.'
+        )
+
+        review_url = f'/api/v1/titles/{title_id}/reviews/{review.json()["id"]}/'
+        response = admin_client.patch(review_url, data={'score': 9})
+        assert response.status_code == HTTPStatus.OK
+        assert admin_client.get(url).json().get('rating') == (
+            pytest.approx(20 / 3)
+        ), (
+            'Проверьте, что после изменения оценки отзыва рейтинг '
+            'произведения пересчитывается без округления.'
+        )
+
+        response = admin_client.delete(review_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert admin_client.get(url).json().get('rating') == 5.5, (
+            'Проверьте, что после удаления отзыва рейтинг произведения '
+            'пересчитывается.'
+        )
+
+    def test_02_rating_without_reviews(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.get(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert response.json().get('rating') is None, (
+            'Если отзывов о произведении нет - значением поля `rating` '
+            'должно быть `None`.'
+        )
+
+    def test_03_title_stats(self, admin_client, user_client, moderator_client,
+                            client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/stats/'
+
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{url}` возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        assert data.get('count') == 0
+        assert data.get('mean') is None
+        assert data.get('median') is None
+
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+        create_single_review(user_client, title_id, 'Неплохо', 7)
+        review = create_single_review(
+            moderator_client, title_id, 'Так себе', 4
+        )
+        admin_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{review.json()["id"]}/',
+            data={'score': 1}
+        )
+        data = client.get(url).json()
+        assert data.get('count') == 3
+        assert data.get('mean') == 6
+        assert data.get('median') == 7
+        expected = {str(score): 0 for score in range(1, 11)}
+        expected.update({'1': 1, '7': 1, '10': 1})
+        assert data.get('distribution') == expected, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'распределение оценок в поле `distribution`.'
+        )
+
+    def test_04_review_create_queries(self, admin_client, user_client,
+                                      django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = {'text': 'Хорошо', 'score': 8}
+        # пользователь, BEGIN, UPDATE счётчиков, INSERT отзыва и в той же
+        # транзакции версия отзывов (первая запись версии - ещё INSERT),
+        # название произведения для ответа
+        with django_assert_num_queries(7):
+            response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.CREATED
+
+        response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторный отзыв на произведение возвращает '
+            'ответ со статусом 400.'
+        )
+        response = user_client.post('/api/v1/titles/999/reviews/', data=data)
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        data = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/').json()
+        assert data['rating'] == 8, (
+            'Проверьте, что отклонённые отзывы не меняют рейтинг.'
+        )
+
+    def test_05_rating_after_author_deletion(self, admin_client, user_client,
+                                             moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        create_single_review(moderator_client, titles[0]['id'], 'Шедевр', 10)
+        create_single_review(user_client, titles[0]['id'], 'Скучно', 2)
+
+        response = admin_client.delete('/api/v1/users/TestUser/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        data = admin_client.get(url).json()
+        assert data['rating'] == 10, (
+            'Проверьте, что при удалении пользователя его отзывы '
+            'исключаются из рейтинга произведения.'
+        )
+        stats = admin_client.get(f'{url}stats/').json()
+        assert stats['count'] == 1
+        assert stats['distribution']['2'] == 0
+
+    def test_06_repeated_review_delete(self, admin_client, user_client,
+                                       moderator_client):
+        from reviews.models import Review, Title
+        from reviews.services import delete_review
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Хорошо', 8)
+        create_single_review(moderator_client, titles[0]['id'], 'Плохо', 2)
+        # Оба запроса на удаление получили объект до удаления
+        first = Review.objects.get(score=2)
+        second = Review.objects.get(score=2)
+        delete_review(first)
+        delete_review(second)
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.review_count, title.score_sum, title.rating) == (
+            1, 8, 8
+        ), (
+            'Проверьте, что повторное удаление отзыва не меняет счётчики '
+            'произведения.'
+        )
@@ -0,0 +1,85 @@
+import pytest
+
+from tests.utils import create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    @pytest.mark.parametrize('query', (
+        '',
+        '?genre=comedy',
+        '?category=films',
+        '?year=1984',
+        '?name=Терм',
+    ))
+    def test_01_title_list_queries(self, admin_client, client,
+                                   django_assert_num_queries, query):
+        titles, _, _ = create_titles(admin_client)
+        for title in titles * 3:
+            admin_client.post('/api/v1/titles/', data=title)
+        url = f'/api/v1/titles/{query}'
+        # версии для ETag и ключа count, count, страница произведений
+        # с категориями, жанры страницы
+        with django_assert_num_queries(4):
+            response = client.get(url)
+        assert response.json()['results'], (
+            f'Проверьте, что GET-запрос к `{url}` возвращает произведения.'
+        )
+
+    def test_02_title_detail_queries(self, admin_client, client,
+                                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        # версии для ETag, произведение с категорией, жанры
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.json()['genre'], (
+            f'Проверьте, что GET-запрос к `{url}` возвращает жанры '
+            'произведения.'
+        )
+
+    def test_03_review_list_queries(self, admin_client, admin, user,
+                                    user_client, moderator, moderator_client,
+                                    client, django_assert_num_queries):
+        _, reviews, titles = create_comments(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        })
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        # версии для ETag и ключа count, произведение, count, страница
+        # отзывов с авторами
+        with django_assert_num_queries(4):
+            response = client.get(url)
+        assert len(response.json()['results']) == len(reviews)
+
+    def test_04_nested_parent_resolved_once(self, admin_client, admin,
+                                            django_assert_num_queries):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/'
+        )
+        # пользователь, отзыв с произведением, INSERT комментария,
+        # версия комментариев
+        with django_assert_num_queries(4) as context:
+            admin_client.post(url, data={'text': 'Ещё'})
+        parent_lookups = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_review"' in query['sql']
+        ]
+        assert len(parent_lookups) == 1, (
+            'Проверьте, что отзыв и его произведение проверяются одним '
+            'запросом на каждый запрос к вложенному маршруту.'
+        )
+        response = admin_client.get(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/'
+        )
+        assert response.status_code == 404, (
+            'Проверьте, что отзыв другого произведения не найден.'
+        )
@@ -0,0 +1,100 @@
+import base64
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments, create_titles
+
+
+def collect_pages(client, url, link='next'):
+    results = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в режиме курсора ответ не содержит ключ `count`.'
+        )
+        page = [item['id'] for item in data['results']]
+        results.extend(page if link == 'next' else reversed(page))
+        url = data[link]
+    return results
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    def test_01_titles_cursor(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        for title in titles * 4:
+            admin_client.post('/api/v1/titles/', data=title)
+        from reviews.models import Title
+        expected = sorted(
+            Title.objects.values_list('id', flat=True), reverse=True
+        )
+
+        forward = collect_pages(client, '/api/v1/titles/?cursor=')
+        assert forward == expected, (
+            'Проверьте, что в режиме курсора `/api/v1/titles/` '
+            'возвращает все произведения по убыванию id без повторов.'
+        )
+
+        last_page = client.get('/api/v1/titles/?cursor=').json()
+        while last_page['next']:
+            last_page = client.get(last_page['next']).json()
+        backward = collect_pages(client, last_page['previous'], 'previous')
+        assert backward == list(reversed(expected[:-len(
+            last_page['results'])])), (
+            'Проверьте, что ссылка `previous` в режиме курсора возвращает '
+            'предыдущие страницы.'
+        )
+
+    def test_02_comments_cursor(self, admin_client, admin, user, user_client,
+                                moderator, moderator_client, client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/'
+        )
+        for _ in range(4):
+            comments.append(
+                admin_client.post(url, data={'text': 'ещё'}).json()
+            )
+        url += '?cursor='
+        assert collect_pages(client, url) == sorted(
+            (comment['id'] for comment in comments), reverse=True
+        ), (
+            'Проверьте, что в режиме курсора комментарии возвращаются от '
+            'новых к старым без повторов и пропусков.'
+        )
+
+    def test_03_invalid_cursor(self, client):
+        response = client.get('/api/v1/titles/?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    @pytest.mark.parametrize('url, position', (
+        ('/api/v1/titles/', ['abc']),
+        ('/api/v1/titles/', [None]),
+        ('/api/v1/titles/', [[1]]),
+        ('/api/v1/titles/{title_id}/reviews/', ['x', 'y']),
+    ))
+    def test_04_malformed_cursor(self, admin_client, client, url, position):
+        titles, _, _ = create_titles(admin_client)
+        url = url.format(title_id=titles[0]['id'])
+        cursor = base64.urlsafe_b64encode(
+            json.dumps({'p': position, 'r': 0}).encode()
+        ).decode()
+        response = client.get(f'{url}?cursor={cursor}')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что курсор со значениями неверного типа приводит к '
+            'ответу со статусом 404.'
+        )
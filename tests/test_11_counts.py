@@ -0,0 +1,90 @@
+import re
+from collections import Counter
+
+import pytest
+
+from tests.utils import create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11PaginationCount:
+
+    def test_01_without_count(self, admin_client, client,
+                              django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        for title in titles * 3:
+            admin_client.post('/api/v1/titles/', data=title)
+        url = '/api/v1/titles/?count=false'
+        # версии для ETag, страница произведений с категориями и жанры
+        # страницы
+        with django_assert_num_queries(3):
+            data = client.get(url).json()
+        assert 'count' not in data, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` не содержит '
+            'ключ `count`.'
+        )
+        assert len(data['results']) == 5
+        assert data['previous'] is None
+        data = client.get(data['next']).json()
+        assert len(data['results']) == 3
+        assert data['next'] is None
+        assert data['previous'] is not None
+
+    def test_02_cached_count_invalidation(self, admin_client, client,
+                                          django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/?genre=horror'
+        assert client.get(url).json()['count'] == 1
+        # версии для ETag и ключа count, страница и жанры без COUNT(*)
+        with django_assert_num_queries(3):
+            assert client.get(url).json()['count'] == 1
+
+        admin_client.post('/api/v1/titles/', data=titles[0])
+        assert client.get(url).json()['count'] == 2, (
+            'Проверьте, что кэш количества объектов сбрасывается при '
+            'добавлении новых объектов.'
+        )
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert client.get(url).json()['count'] == 1, (
+            'Проверьте, что кэш количества объектов сбрасывается при '
+            'удалении объектов.'
+        )
+
+    def test_03_versions_bumped_once_per_operation(
+            self, admin_client, admin, user, user_client, moderator,
+            moderator_client, django_assert_max_num_queries):
+        _, reviews, _ = create_comments(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        })
+        with django_assert_max_num_queries(50) as context:
+            response = moderator_client.post(
+                '/api/v1/moderation/reviews/',
+                data={'ids': [review['id'] for review in reviews]},
+                format='json'
+            )
+        assert response.json() == {'deleted': len(reviews)}
+        bumped = Counter(
+            label for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_dataversion"')
+            for label in re.findall(r"'(reviews\.\w+)'", query['sql'])
+        )
+        assert bumped and set(bumped.values()) == {1}, (
+            'Проверьте, что при удалении отзывов с комментариями версия '
+            'каждой модели увеличивается один раз на операцию, а не на строку.'
+        )
+
+        from reviews.models import ImportManifest
+        ImportManifest.objects.create(
+            file_name='titles.csv', checksum='0', batch_size=1
+        )
+        with django_assert_max_num_queries(5) as context:
+            ImportManifest.objects.all().delete()
+        assert not [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+        ], (
+            'Проверьте, что приёмники сигналов удаления подключены только '
+            'к моделям с версиями и не отключают быстрое удаление.'
+        )
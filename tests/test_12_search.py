@@ -0,0 +1,40 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleSearch:
+
+    def search(self, client, query):
+        response = client.get(f'/api/v1/titles/?search={query}')
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_is_case_insensitive(self, admin_client, client):
+        create_titles(admin_client)
+        assert self.search(client, 'ТЕРМИНАТОР') == ['Терминатор'], (
+            'Проверьте, что поиск по названию не зависит от регистра '
+            'кириллических букв.'
+        )
+        assert self.search(client, 'крепк') == ['Крепкий орешек'], (
+            'Проверьте, что поиск находит произведения по началу слова.'
+        )
+        assert self.search(client, 'yippie') == ['Крепкий орешек'], (
+            'Проверьте, что поиск учитывает описание произведения.'
+        )
+
+    def test_02_search_follows_writes(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        admin_client.patch(url, data={'name': 'Чужой'})
+        assert self.search(client, 'терминатор') == []
+        assert self.search(client, 'чужой') == ['Чужой']
+        admin_client.delete(url)
+        assert self.search(client, 'чужой') == []
+
+    def test_03_search_ranking(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.post('/api/v1/titles/', data={
+            **titles[1], 'name': 'Орешек', 'description': 'орешек орешек'
+        })
+        assert self.search(client, 'орешек') == ['Орешек', 'Крепкий орешек']
@@ -0,0 +1,52 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TitleFacets:
+
+    def test_01_facets(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.post('/api/v1/titles/', data={
+            **titles[0], 'name': 'Терминатор 2', 'year': 1991
+        })
+        url = '/api/v1/titles/facets/'
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        assert response.json() == {
+            'genre': {'horror': 2, 'comedy': 2, 'drama': 1},
+            'category': {'films': 2, 'books': 1},
+            'decade': {'1980': 2, '1990': 1},
+        }, (
+            f'Проверьте, что `{url}` возвращает количество произведений '
+            'по жанрам, категориям и десятилетиям.'
+        )
+
+    def test_02_facets_with_filters(self, admin_client, client,
+                                    django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/facets/?genre=horror&search=терминатор'
+        # версии для ключа кэша и сам подсчёт
+        with django_assert_num_queries(2):
+            data = client.get(url).json()
+        assert data == {
+            'genre': {'horror': 1, 'comedy': 1},
+            'category': {'films': 1},
+            'decade': {'1980': 1},
+        }
+        with django_assert_num_queries(1):
+            client.get(url)
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'genre': ['horror']}
+        )
+        assert client.get(url).json()['genre'] == {'horror': 1}, (
+            'Проверьте, что кэш фасетов сбрасывается при изменении '
+            'произведений.'
+        )
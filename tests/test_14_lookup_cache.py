@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+from tests.utils import create_categories, create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14LookupCache:
+
+    def test_01_genre_list_from_cache(self, admin_client, client,
+                                      django_assert_num_queries):
+        genres = create_genre(admin_client)
+        client.get('/api/v1/genres/')
+        # только версии данных, общие для ETag и проверки кэша
+        with django_assert_num_queries(1):
+            data = client.get('/api/v1/genres/').json()
+        assert data['results'] == sorted(genres, key=lambda g: g['name']), (
+            'Проверьте, что список жанров из кэша совпадает с данными БД.'
+        )
+
+        admin_client.post('/api/v1/genres/', data={
+            'name': 'Вестерн', 'slug': 'western'
+        })
+        assert client.get('/api/v1/genres/').json()['count'] == 4, (
+            'Проверьте, что кэш жанров сбрасывается при создании жанра.'
+        )
+        admin_client.delete('/api/v1/genres/horror/')
+        slugs = {
+            genre['slug']
+            for genre in client.get('/api/v1/genres/').json()['results']
+        }
+        assert 'horror' not in slugs, (
+            'Проверьте, что кэш жанров сбрасывается при удалении жанра.'
+        )
+
+    def test_02_title_write_resolves_slugs_from_cache(
+            self, admin_client, django_assert_max_num_queries):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        admin_client.get('/api/v1/genres/')
+        admin_client.get('/api/v1/categories/')
+        data = {
+            'name': 'Терминатор',
+            'year': 1984,
+            'genre': [genre['slug'] for genre in genres],
+            'category': categories[0]['slug'],
+        }
+        with django_assert_max_num_queries(15) as context:
+            response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == HTTPStatus.CREATED
+        lookups = [
+            query['sql'] for query in context.captured_queries
+            if '"reviews_genre"."slug" =' in query['sql']
+            or '"reviews_category"."slug" =' in query['sql']
+        ]
+        assert not lookups, (
+            'Проверьте, что slug жанров и категорий при создании '
+            'произведения разрешаются через кэш, без запросов к БД.'
+        )
+        version_reads = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and '"reviews_dataversion"' in query['sql']
+        ]
+        assert len(version_reads) == 1, (
+            'Проверьте, что версии справочников читаются один раз на '
+            'запрос, а не при каждом обращении к кэшу.'
+        )
+
+        data['genre'] = ['unknown']
+        response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_invalidated_by_other_process(self, admin_client, client):
+        categories = create_categories(admin_client)
+        create_genre(admin_client)
+        client.get('/api/v1/genres/')
+        # Так пишет другой процесс: только в БД, память этого процесса
+        # и его LocMemCache не затрагиваются
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO reviews_genre (name, slug) "
+                "VALUES ('Вестерн', 'western')"
+            )
+            cursor.execute(
+                "UPDATE reviews_dataversion SET version = version + 1 "
+                "WHERE model = 'reviews.genre'"
+            )
+        slugs = {
+            genre['slug']
+            for genre in client.get('/api/v1/genres/').json()['results']
+        }
+        assert 'western' in slugs, (
+            'Проверьте, что кэш жанров сбрасывается при записи в другом '
+            'процессе.'
+        )
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Хороший, плохой, злой',
+            'year': 1966,
+            'genre': ['western'],
+            'category': categories[0]['slug'],
+        })
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что slug, созданный в другом процессе, принимается '
+            'при создании произведения.'
+        )
@@ -0,0 +1,115 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ConditionalGet:
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/titles/', '/api/v1/genres/', '/api/v1/categories/'
+    ))
+    def test_01_not_modified(self, admin_client, client,
+                             django_assert_num_queries, url):
+        create_titles(admin_client)
+        response = client.get(url)
+        etag = response.get('ETag')
+        assert etag and etag.startswith('"'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'строгий заголовок `ETag`.'
+        )
+        assert response.get('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовок `Last-Modified`.'
+        )
+        # только версии данных, без выборки и сериализации
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        response = client.get(f'{url}?page=1', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_02_etag_changes_on_write(self, admin_client, user_client,
+                                      client):
+        titles, _, _ = create_titles(admin_client)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+        title_etag = client.get(title_url)['ETag']
+        reviews_etag = client.get(reviews_url)['ETag']
+
+        create_single_review(user_client, titles[0]['id'], 'Хорошо', 8)
+        response = client.get(title_url, HTTP_IF_NONE_MATCH=title_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый отзыв меняет `ETag` произведения, '
+            'так как меняется его рейтинг.'
+        )
+        assert response.json()['rating'] == 8
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый отзыв меняет `ETag` списка отзывов.'
+        )
+
+    def test_03_validators_shared_between_processes(self, admin_client,
+                                                    client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = client.get(url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        # Другой процесс начинает с пустым кэшем
+        cache.clear()
+        response = client.get(url)
+        assert response['ETag'] == etag, (
+            'Проверьте, что `ETag` не зависит от процесса, обработавшего '
+            'запрос.'
+        )
+        assert response['Last-Modified'] == last_modified
+
+        # Запись в другом процессе: только в БД, минуя этот процесс
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE reviews_title SET name = 'Терминатор 2' "
+                "WHERE id = %s", [titles[0]['id']]
+            )
+            cursor.execute(
+                "UPDATE reviews_dataversion SET version = version + 1 "
+                "WHERE model = 'reviews.title'"
+            )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после записи в другом процессе `If-None-Match` '
+            'со старым `ETag` не даёт ответ 304.'
+        )
+        assert response.json()['name'] == 'Терминатор 2'
+
+    def test_04_version_bumped_with_write(self, admin_client):
+        from api.cache import get_version
+        from reviews.models import Genre
+
+        create_titles(admin_client)
+        version = get_version(Genre)
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                Genre.objects.create(name='Вестерн', slug='western')
+                assert get_version(Genre) > version, (
+                    'Проверьте, что версия данных увеличивается в той же '
+                    'транзакции, что и запись.'
+                )
+                raise RuntimeError
+        assert get_version(Genre) == version, (
+            'Проверьте, что при откате транзакции откатывается и версия.'
+        )
+        with transaction.atomic():
+            Genre.objects.create(name='Вестерн', slug='western')
+            Genre.objects.create(name='Нуар', slug='noir')
+        assert get_version(Genre) > version, (
+            'Проверьте, что запись после отката транзакции снова '
+            'увеличивает версию данных.'
+        )
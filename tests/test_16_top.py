@@ -0,0 +1,44 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitleLeaderboard:
+
+    def test_01_top(self, admin_client, user_client, moderator_client,
+                    client, django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.post('/api/v1/titles/', data={
+            **titles[0], 'name': 'Без отзывов'
+        })
+        create_single_review(admin_client, titles[0]['id'], 'Ок', 6)
+        create_single_review(user_client, titles[0]['id'], 'Ок', 6)
+        create_single_review(moderator_client, titles[1]['id'], 'Ого', 9)
+
+        url = '/api/v1/titles/top/'
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        assert [title['id'] for title in response.json()] == [
+            titles[1]['id'], titles[0]['id']
+        ], (
+            f'Проверьте, что `{url}` возвращает произведения с отзывами '
+            'по убыванию рейтинга.'
+        )
+        data = client.get(f'{url}?by=reviews').json()
+        assert [title['id'] for title in data] == [
+            titles[0]['id'], titles[1]['id']
+        ]
+        data = client.get(f'{url}?by=reviews&category=books').json()
+        assert [title['id'] for title in data] == [titles[1]['id']]
+        data = client.get(f'{url}?genre=comedy&limit=1').json()
+        assert [title['id'] for title in data] == [titles[0]['id']]
+
+        response = client.get(f'{url}?by=name')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,37 @@
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17CommentPayload:
+
+    def test_01_compact_comments(self, admin_client, admin, user,
+                                 user_client, client,
+                                 django_assert_num_queries):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/'
+        )
+        # версии для ETag и ключа count, отзыв, count, страница
+        # комментариев с авторами
+        with django_assert_num_queries(4):
+            data = client.get(url).json()
+        for comment in data['results']:
+            assert comment['review'] == reviews[0]['id'], (
+                f'Проверьте, что комментарии в ответе на GET-запрос к '
+                f'`{url}` содержат id отзыва в поле `review`.'
+            )
+            assert 'review_excerpt' not in comment
+
+        with django_assert_num_queries(4):
+            data = client.get(f'{url}?include=review_excerpt').json()
+        assert {
+            comment['review_excerpt'] for comment in data['results']
+        } == {reviews[0]['text']}, (
+            'Проверьте, что при `?include=review_excerpt` комментарии '
+            'содержат начало текста отзыва.'
+        )
@@ -0,0 +1,52 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments, create_single_comment
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18CommentsPreview:
+
+    def test_01_reviews_with_comments_preview(
+            self, admin_client, admin, user, user_client, moderator,
+            moderator_client, client, django_assert_num_queries):
+        comments, reviews, titles = create_comments(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        })
+        newest = create_single_comment(
+            admin_client, titles[0]['id'], reviews[0]['id'], 'Последний'
+        ).json()
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            '?include=comments_preview&preview_size=2'
+        )
+        # версии для ETag и ключа count, произведение, count, страница
+        # отзывов, превью комментариев
+        with django_assert_num_queries(5):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        results = {
+            review['id']: review for review in response.json()['results']
+        }
+        first = results[reviews[0]['id']]
+        assert first['comment_count'] == len(comments) + 1, (
+            f'Проверьте, что `{url}` возвращает количество комментариев '
+            'к отзыву в поле `comment_count`.'
+        )
+        assert [c['id'] for c in first['comments_preview']] == [
+            newest['id'], comments[-1]['id']
+        ], (
+            f'Проверьте, что `{url}` возвращает новейшие комментарии '
+            'к отзыву в поле `comments_preview`.'
+        )
+        assert first['comments_preview'][0]['author'] == admin.username
+        assert results[reviews[1]['id']]['comment_count'] == 0
+        assert results[reviews[1]['id']]['comments_preview'] == []
+
+        data = client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        ).json()
+        assert 'comments_preview' not in data['results'][0]
@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19BulkModeration:
+
+    @pytest.fixture
+    def data(self, admin_client, admin, user, user_client, moderator,
+             moderator_client):
+        return create_comments(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        })
+
+    def test_01_permissions(self, data, client, user_client):
+        comments, reviews, _ = data
+        for url in ('/api/v1/moderation/reviews/',
+                    '/api/v1/moderation/comments/'):
+            response = client.post(url, data={'ids': [1]}, format='json')
+            assert response.status_code == HTTPStatus.UNAUTHORIZED
+            response = user_client.post(url, data={'ids': [1]},
+                                        format='json')
+            assert response.status_code == HTTPStatus.FORBIDDEN, (
+                f'Проверьте, что POST-запрос пользователя к `{url}` '
+                'возвращает ответ со статусом 403.'
+            )
+
+    def test_02_bulk_delete_reviews(self, data, moderator_client,
+                                    client, user, settings):
+        settings.MODERATION_CHUNK_SIZE = 1
+        _, reviews, titles = data
+        url = '/api/v1/moderation/reviews/'
+        response = moderator_client.post(url, data={}, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что POST-запрос к `{url}` без условий отбора '
+            'возвращает ответ со статусом 400.'
+        )
+        response = moderator_client.post(url, data={
+            'ids': [review['id'] for review in reviews[:2]]
+        }, format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'deleted': 2}
+        title = client.get(f'/api/v1/titles/{titles[0]["id"]}/').json()
+        assert title['rating'] == 5
+        stats = client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/stats/'
+        ).json()
+        assert stats['count'] == 1, (
+            'Проверьте, что массовое удаление отзывов обновляет счётчики '
+            'произведений.'
+        )
+
+    def test_03_bulk_delete_comments(self, data, admin_client, user,
+                                     client):
+        comments, reviews, titles = data
+        response = admin_client.post('/api/v1/moderation/comments/', data={
+            'author': user.username, 'title': titles[0]['id']
+        }, format='json')
+        assert response.json() == {'deleted': 1}
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/'
+        )
+        authors = {c['author'] for c in client.get(url).json()['results']}
+        assert user.username not in authors
+        assert len(authors) == len(comments) - 1
@@ -0,0 +1,196 @@
+import csv
+from collections import Counter
+from datetime import datetime, timezone
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Avg
+from django.test.utils import CaptureQueriesContext
+
+from reviews.csv_import import CSV_FILES, import_stages
+from reviews.models import MAX_SCORE, MIN_SCORE, Review, Title
+
+
+def copy_dataset(target):
+    for file_name in CSV_FILES:
+        source = Path(settings.CSV_FILE_PATH) / file_name
+        (target / file_name).write_bytes(source.read_bytes())
+
+
+def csv_rows(file_name):
+    path = Path(settings.CSV_FILE_PATH) / file_name
+    with open(path, newline='', encoding='utf-8') as file:
+        return list(csv.DictReader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20ImportCsv:
+
+    def test_01_import_all_files(self):
+        call_command(
+            'import_csv', batch_size=7, workers=2, stdout=StringIO()
+        )
+        for file_name, model in CSV_FILES.items():
+            assert model.objects.count() == len(csv_rows(file_name)), (
+                f'Проверьте, что команда `import_csv` загружает все строки '
+                f'файла `{file_name}`.'
+            )
+
+        row = csv_rows('review.csv')[0]
+        review = Review.objects.get(pk=row['id'])
+        assert review.pub_date == datetime.fromisoformat(
+            row['pub_date'].replace('Z', '')
+        ).replace(tzinfo=timezone.utc), (
+            'Проверьте, что при импорте сохраняется дата публикации из CSV.'
+        )
+        assert review.author_id == int(row['author'])
+
+        scores = Counter(
+            (row['title_id'], int(row['score']))
+            for row in csv_rows('review.csv')
+        )
+        for title in Title.objects.all():
+            distribution = {
+                score: scores[(str(title.id), score)]
+                for score in range(MIN_SCORE, MAX_SCORE + 1)
+            }
+            review_count = sum(distribution.values())
+            assert title.score_distribution == distribution, (
+                'Проверьте, что после импорта распределение оценок '
+                'произведений пересчитано.'
+            )
+            assert title.review_count == review_count
+            assert title.score_sum == sum(
+                score * count for score, count in distribution.items()
+            )
+            expected = title.reviews.aggregate(rating=Avg('score'))['rating']
+            assert title.rating == pytest.approx(expected), (
+                'Проверьте, что после импорта рейтинги произведений '
+                'пересчитаны.'
+            )
+
+    def test_02_stages_follow_foreign_keys(self):
+        assert import_stages() == [
+            ['users.csv', 'category.csv', 'genre.csv'],
+            ['titles.csv'],
+            ['genre_title.csv', 'review.csv'],
+            ['comments.csv'],
+        ], (
+            'Проверьте, что файлы импортируются по этапам: сначала те, на '
+            'которые ссылаются внешние ключи остальных.'
+        )
+
+    def test_03_invalid_row_rolls_back_stage(self, tmp_path):
+        copy_dataset(tmp_path)
+        with open(tmp_path / 'titles.csv', 'a', encoding='utf-8') as file:
+            file.write('999,Без года,не число,1\n')
+
+        with pytest.raises(CommandError, match='titles.csv'):
+            call_command(
+                'import_csv', path=tmp_path, workers=1, stdout=StringIO()
+            )
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибке в данных этап импорта '
+            'откатывается целиком.'
+        )
+
+    def test_04_reimport_writes_only_changes(self, tmp_path):
+        copy_dataset(tmp_path)
+        call_command('import_csv', path=tmp_path, batch_size=10, workers=1,
+                     stdout=StringIO())
+
+        output = StringIO()
+        call_command('import_csv', path=tmp_path, batch_size=10, workers=1,
+                     stdout=output)
+        assert 'добавлено 0, обновлено 0' in output.getvalue().splitlines(
+        )[-2], (
+            'Проверьте, что повторный импорт тех же файлов ничего не '
+            'записывает в базу данных.'
+        )
+
+        rows = csv_rows('review.csv')
+        review = Review.objects.get(pk=rows[-1]['id'])
+        new_score = 1 if review.score != 1 else 2
+        with open(tmp_path / 'review.csv', 'w', newline='',
+                  encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=rows[0].keys())
+            writer.writeheader()
+            rows[-1]['score'] = new_score
+            writer.writerows(rows)
+
+        output = StringIO()
+        with CaptureQueriesContext(connection) as context:
+            call_command('import_csv', path=tmp_path, batch_size=10,
+                         workers=1, stdout=output)
+        assert 'добавлено 0, обновлено 1' in output.getvalue().splitlines(
+        )[-2], (
+            'Проверьте, что при повторном импорте перезаписываются только '
+            'изменившиеся строки.'
+        )
+        review.refresh_from_db()
+        assert review.score == new_score
+        title = Title.objects.get(pk=review.title_id)
+        expected = title.reviews.aggregate(rating=Avg('score'))['rating']
+        assert title.rating == pytest.approx(expected), (
+            'Проверьте, что после повторного импорта рейтинги пересчитаны.'
+        )
+        title_updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_title"')
+        ]
+        assert len(title_updates) == 1, (
+            'Проверьте, что после повторного импорта пересчитываются '
+            'только произведения с изменившимися отзывами.'
+        )
+
+    def test_05_repeated_scores(self, tmp_path):
+        copy_dataset(tmp_path)
+        rows = csv_rows('review.csv')
+        title_id = Counter(row['title_id'] for row in rows).most_common(1)[0][0]
+        for index, row in enumerate(rows):
+            if row['title_id'] == title_id:
+                row['score'] = 5
+                row['pub_date'] = f'2020-01-{index % 28 + 1:02d}T00:00:00Z'
+        with open(tmp_path / 'review.csv', 'w', newline='',
+                  encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=rows[0].keys())
+            writer.writeheader()
+            writer.writerows(rows)
+
+        call_command('import_csv', path=tmp_path, workers=1,
+                     stdout=StringIO())
+        title = Title.objects.get(pk=title_id)
+        review_count = title.reviews.count()
+        assert review_count > 1
+        assert title.score_distribution[5] == review_count, (
+            'Проверьте, что после импорта учитываются все отзывы '
+            'произведения с одинаковой оценкой.'
+        )
+        assert title.review_count == review_count
+        assert title.rating == 5
+
+    def test_06_reimport_updates_search_index(self, client, tmp_path):
+        copy_dataset(tmp_path)
+        call_command('import_csv', path=tmp_path, workers=1,
+                     stdout=StringIO())
+        rows = csv_rows('titles.csv')
+        rows[0]['name'] = 'Бармаглот'
+        with open(tmp_path / 'titles.csv', 'w', newline='',
+                  encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=rows[0].keys())
+            writer.writeheader()
+            writer.writerows(rows)
+
+        call_command('import_csv', path=tmp_path, workers=1,
+                     stdout=StringIO())
+        results = client.get(
+            '/api/v1/titles/?search=бармаглот'
+        ).json()['results']
+        assert [title['id'] for title in results] == [int(rows[0]['id'])], (
+            'Проверьте, что после повторного импорта изменённые '
+            'произведения переиндексируются для поиска.'
+        )
@@ -0,0 +1,73 @@
+import csv
+import json
+from http import HTTPStatus
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from reviews.csv_export import CSV_COLUMNS
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as file:
+        return list(csv.reader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Export:
+
+    def test_01_export_matches_source_layout(self, tmp_path):
+        call_command('import_csv', workers=1, stdout=StringIO())
+        call_command('export_data', tmp_path, chunk_size=5, stdout=StringIO())
+        for file_name in CSV_COLUMNS:
+            source = read_csv(Path(settings.CSV_FILE_PATH) / file_name)
+            exported = read_csv(tmp_path / file_name)
+            assert exported[0] == source[0], (
+                f'Проверьте, что заголовок выгруженного `{file_name}` '
+                'совпадает с исходным файлом.'
+            )
+            assert sorted(exported[1:], key=lambda row: int(row[0])) == (
+                sorted(source[1:], key=lambda row: int(row[0]))
+            ), (
+                f'Проверьте, что выгруженный `{file_name}` содержит те же '
+                'строки, что и загруженный.'
+            )
+
+    def test_02_export_endpoint(self, admin_client, user_client):
+        call_command('import_csv', workers=1, stdout=StringIO())
+        url = '/api/v1/export/review.ndjson'
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что GET-запрос к `{url}` доступен только '
+            'администратору.'
+        )
+
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            f'Проверьте, что `{url}` отдаёт данные потоком.'
+        )
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        source = read_csv(Path(settings.CSV_FILE_PATH) / 'review.csv')
+        assert len(lines) == len(source) - 1
+        assert set(json.loads(lines[0])) == set(source[0])
+
+        response = admin_client.get('/api/v1/export/unknown.csv')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_ndjson_keeps_description(self, admin_client):
+        call_command('import_csv', workers=1, stdout=StringIO())
+        from reviews.models import Title
+        Title.objects.filter(pk=1).update(description='Описание')
+        response = admin_client.get('/api/v1/export/titles.ndjson')
+        titles = [
+            json.loads(line) for line in
+            b''.join(response.streaming_content).decode().splitlines()
+        ]
+        assert titles[0]['description'] == 'Описание', (
+            'Проверьте, что выгрузка произведений в NDJSON содержит '
+            'описание.'
+        )
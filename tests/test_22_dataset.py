@@ -0,0 +1,68 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Avg, Count
+
+from reviews.dataset import zipf_counts
+from reviews.models import Comment, Review, Title, User
+
+SCALE = {
+    'users': 50, 'categories': 3, 'genres': 5, 'titles': 40,
+    'reviews': 400, 'comments': 300,
+}
+
+
+def generate(**options):
+    call_command('generate_dataset', stdout=StringIO(), **SCALE, **options)
+
+
+def snapshot():
+    return list(Review.objects.order_by('id').values_list(
+        'title_id', 'author_id', 'score', 'pub_date'
+    )) + list(Comment.objects.order_by('id').values_list(
+        'review_id', 'author_id', 'pub_date'
+    ))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Dataset:
+
+    def test_01_zipf_counts(self):
+        counts = zipf_counts(1000, 100, 1.0, 60)
+        assert sum(counts) == 1000
+        assert max(counts) == 60, (
+            'Проверьте, что количество отзывов на произведение не превышает '
+            'количества пользователей.'
+        )
+        assert counts == sorted(counts, reverse=True)
+
+    def test_02_generate_dataset(self):
+        generate(seed=7)
+        assert User.objects.count() == SCALE['users']
+        assert Review.objects.count() == SCALE['reviews']
+        assert Comment.objects.count() == SCALE['comments']
+
+        per_title = sorted(
+            Title.objects.annotate(total=Count('reviews'))
+            .values_list('total', flat=True), reverse=True
+        )
+        assert per_title[0] > 5 * per_title[len(per_title) // 2], (
+            'Проверьте, что отзывы распределены по произведениям неравномерно.'
+        )
+        title = Title.objects.order_by('-review_count').first()
+        assert title.rating == pytest.approx(
+            title.reviews.aggregate(rating=Avg('score'))['rating']
+        ), 'Проверьте, что после генерации рейтинги пересчитаны.'
+
+        with pytest.raises(CommandError):
+            generate(seed=7)
+
+    def test_03_same_seed_same_data(self):
+        generate(seed=7)
+        first = snapshot()
+        call_command('flush', interactive=False)
+        generate(seed=7)
+        assert snapshot() == first, (
+            'Проверьте, что при одинаковом seed данные совпадают.'
+        )
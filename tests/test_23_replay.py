@@ -0,0 +1,51 @@
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.recording import MASK, read_log
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Replay:
+
+    def test_01_record_and_replay(self, settings, tmp_path, admin_client,
+                                  client):
+        log = tmp_path / 'requests.ndjson'
+        settings.REQUEST_LOG_FILE = str(log)
+        settings.REQUEST_LOG_SAMPLE_RATE = 1
+        create_titles(admin_client)
+        assert client.get('/api/v1/titles/').status_code == HTTPStatus.OK
+        client.post('/api/v1/auth/token/', data={
+            'username': 'nobody', 'confirmation_code': 'secret'
+        }, content_type='application/json')
+
+        records = read_log(log)
+        titles = [record for record in records
+                  if record['v'] == 'titles-list']
+        assert {record['r'] for record in titles} == {'admin', 'anon'}, (
+            'Проверьте, что в журнал записывается роль пользователя.'
+        )
+        token_request = next(
+            record for record in records if record['p'].endswith('token/')
+        )
+        assert token_request['b']['confirmation_code'] == MASK, (
+            'Проверьте, что секреты из тела запроса не попадают в журнал.'
+        )
+        assert 'secret' not in log.read_text(encoding='utf-8')
+
+        settings.REQUEST_LOG_FILE = None
+        output = tmp_path / 'replay.json'
+        call_command('replay_requests', str(log), concurrency=2,
+                     output=str(output), stdout=StringIO())
+        summary = json.loads(output.read_text(encoding='utf-8'))
+        assert summary['GET titles-list']['requests'] == 1
+        assert summary['GET titles-list']['statuses'] == {'200': 1}, (
+            'Проверьте, что `replay_requests` повторяет запросы журнала.'
+        )
+        assert summary['POST titles-list']['requests'] == len([
+            record for record in titles if record['m'] == 'POST'
+        ])
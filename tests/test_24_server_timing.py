@@ -0,0 +1,53 @@
+import json
+import logging
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+def parse_server_timing(header):
+    metrics = {}
+    for metric in header.split(', '):
+        name, *params = metric.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24ServerTiming:
+
+    def test_01_server_timing_header(self, settings, admin_client, caplog):
+        settings.SERVER_TIMING = True
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        logger = logging.getLogger('api.timing')
+        logger.addHandler(caplog.handler)
+        try:
+            response = admin_client.get(url)
+        finally:
+            logger.removeHandler(caplog.handler)
+        assert response.status_code == HTTPStatus.OK
+        metrics = parse_server_timing(response.get('Server-Timing', ''))
+        for name in ('total', 'db', 'auth', 'permissions', 'serialize',
+                     'render'):
+            assert name in metrics, (
+                f'Проверьте, что заголовок `Server-Timing` содержит '
+                f'метрику `{name}`.'
+            )
+            assert float(metrics[name]['dur']) >= 0
+        assert metrics['db']['desc'].strip('"').endswith('queries')
+
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['path'] == url
+        assert record['queries'] > 0, (
+            'Проверьте, что в лог `api.timing` пишется число запросов к БД.'
+        )
+
+    def test_02_disabled_by_default(self, client):
+        response = client.get('/api/v1/titles/')
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что без настройки `SERVER_TIMING` заголовок '
+            '`Server-Timing` не добавляется.'
+        )
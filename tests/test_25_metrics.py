@@ -0,0 +1,72 @@
+import multiprocessing
+import re
+from http import HTTPStatus
+
+import pytest
+
+from api.metrics import REQUESTS, registry
+
+REQUESTS_SAMPLE = (
+    'yamdb_requests_total{{view="{view}",action="{action}",status="200"}}'
+)
+
+
+def sample_value(text, sample):
+    match = re.search(rf'^{re.escape(sample)} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else 0
+
+
+def increment_in_child():
+    REQUESTS.inc(view='ChildView', action='list', status=200)
+    registry.flush()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Metrics:
+
+    def test_01_request_metrics(self, client):
+        sample = REQUESTS_SAMPLE.format(view='GenreViewSet', action='list')
+        before = sample_value(client.get('/metrics').content.decode(), sample)
+        assert client.get('/api/v1/genres/').status_code == HTTPStatus.OK
+
+        response = client.get('/metrics')
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/plain'), (
+            'Проверьте, что `/metrics` отдаёт метрики в текстовом формате '
+            'Prometheus.'
+        )
+        text = response.content.decode()
+        assert sample_value(text, sample) == before + 1, (
+            'Проверьте, что `/metrics` считает запросы по представлению, '
+            'действию и статусу.'
+        )
+        for name in (
+            'yamdb_request_duration_seconds_bucket{view="GenreViewSet",'
+            'action="list",method="GET",le="+Inf"}',
+            'yamdb_request_queries_count{view="GenreViewSet",action="list"}',
+            'yamdb_request_db_duration_seconds_sum{view="GenreViewSet",'
+            'action="list"}',
+            'yamdb_cache_requests_total{cache="lookup:genre",result="miss"}',
+        ):
+            assert sample_value(text, name) > 0, (
+                f'Проверьте, что `/metrics` содержит `{name}`.'
+            )
+
+    def test_02_metrics_from_other_processes(self, client, settings,
+                                             tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        sample = REQUESTS_SAMPLE.format(view='ChildView', action='list')
+        before = sample_value(client.get('/metrics').content.decode(), sample)
+        for _ in range(2):
+            process = multiprocessing.get_context('fork').Process(
+                target=increment_in_child
+            )
+            process.start()
+            process.join()
+            assert process.exitcode == 0
+
+        text = client.get('/metrics').content.decode()
+        assert sample_value(text, sample) == before + 2, (
+            'Проверьте, что `/metrics` суммирует метрики всех процессов '
+            'из METRICS_DIR.'
+        )
@@ -0,0 +1,41 @@
+import importlib
+
+import pytest
+from django.apps import apps
+from django.db import connection
+
+from tests.utils import create_titles
+
+migration = importlib.import_module(
+    'reviews.migrations.0006_copy_title_genre_links'
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26GenreLinksMigration:
+
+    def test_01_copy_old_links(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[1]['id']
+        url = f'/api/v1/titles/{title_id}/'
+        etag = client.get(url)['ETag']
+        # Связи, созданные до перевода поля на GenreTitle
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO reviews_title_genre (title_id, genre_id) '
+                'SELECT %s, id FROM reviews_genre', [title_id]
+            )
+        try:
+            with connection.schema_editor() as schema_editor:
+                migration.copy_title_genre_links(apps, schema_editor)
+                migration.copy_title_genre_links(apps, schema_editor)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('DELETE FROM reviews_title_genre')
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert len(response.json()['genre']) == 3, (
+            'Проверьте, что миграция переносит связи из таблицы '
+            '`reviews_title_genre` без повторов и сбрасывает кэш '
+            'произведений.'
+        )
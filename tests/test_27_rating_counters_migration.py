@@ -0,0 +1,40 @@
+import importlib
+
+import pytest
+from django.apps import apps
+from django.db import connection
+
+from reviews.models import Title
+from tests.utils import create_single_review, create_titles
+
+migration = importlib.import_module(
+    'reviews.migrations.0002_title_rating_counters'
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27RatingCountersMigration:
+
+    def test_01_counters_from_existing_reviews(self, admin_client,
+                                               user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+        create_single_review(user_client, title_id, 'Так себе', 5)
+        # Так выглядят счётчики сразу после добавления столбцов
+        Title.objects.update(
+            review_count=0, score_sum=0, rating=None, score_5_count=0,
+            score_10_count=0
+        )
+
+        with connection.schema_editor() as schema_editor:
+            migration.recalculate_title_ratings(apps, schema_editor)
+
+        title = Title.objects.get(pk=title_id)
+        assert (title.review_count, title.rating) == (2, 7.5), (
+            'Проверьте, что миграция счётчиков заполняет их по уже '
+            'существующим отзывам.'
+        )
+        assert title.score_distribution[5] == 1
+        assert title.score_distribution[10] == 1
+        assert Title.objects.get(pk=titles[1]['id']).review_count == 0